@@ -4,111 +4,255 @@ Orchestrates file scanning, parsing, LLM analysis, and table generation.
 """
 
 import argparse
+import contextlib
+import itertools
 import sys
 from pathlib import Path
 
 # Add phase1 directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from file_scanner import find_header_files, get_file_content
-from basic_parser import parse_header_file
-from llm_agent import analyze_interfaces
-from table_generator import generate_markdown_table
+from file_scanner import iter_header_files, get_file_content
+from parse_pool import parse_files, get_parse_function, BACKENDS
+from llm_engine import enhance_stream, open_llm_session, DEFAULT_BATCH_TOKENS
+from llm_agent import DEFAULT_TIMEOUT
+from llm_policy import LLMPolicy, DEFAULT_MIN_DOC_WORDS
+from llm_cache import LLMCache
+from manifest import FileManifest
+from records import FileRecord
+from result_store import ResultStoreWriter
+from symbol_index import SymbolIndex
+from include_graph import IncludeGraph, scan_includes
+from table_generator import open_writer, WRITERS, SHARD_KEYS
 
 
 def analyze_project(project_path: str, 
                    output_file: str = "interfaces_table.md",
                    use_local_llm: bool = True,
+                   use_llm: bool = True,
                    max_files: int = None,
-                   exclude_dirs: list = None):
+                   exclude_dirs: list = None,
+                   llm_concurrency: int = 4,
+                   llm_rate_limit: float = None,
+                   llm_retries: int = 3,
+                   llm_batch_tokens: int = 0,
+                   llm_timeout: float = DEFAULT_TIMEOUT,
+                   llm_policy: LLMPolicy = None,
+                   use_llm_cache: bool = True,
+                   llm_cache_dir: str = None,
+                   incremental: bool = False,
+                   manifest_file: str = None,
+                   jobs: int = 1,
+                   backend: str = "basic",
+                   include_patterns: list = None,
+                   use_git: bool = False,
+                   scan_workers: int = 1,
+                   store_file: str = None,
+                   output_format: str = "markdown",
+                   shard_by: str = "directory",
+                   symbol_index_file: str = None,
+                   include_graph_file: str = None):
     """
     Analyze a C++ project and generate an interface table.
     
     Args:
         project_path: Path to the project directory
-        output_file: Output markdown file path
+        output_file: Output file path (a directory for "markdown-shards")
         use_local_llm: Use local Ollama (True) or OpenAI (False)
+        use_llm: Enhance descriptions with an LLM (False keeps the parsed
+                 descriptions and never imports the LLM libraries)
         max_files: Maximum number of files to analyze (None for all)
-        exclude_dirs: Additional directories to exclude
+        exclude_dirs: Additional directories or gitignore-style patterns to exclude
+        llm_concurrency: Maximum number of in-flight LLM requests
+        llm_rate_limit: LLM requests/second (None for the provider default)
+        llm_retries: Retries per LLM request before falling back
+        llm_batch_tokens: Describe several interfaces per request within this
+                          estimated prompt token budget (0 for one per request)
+        llm_timeout: Per-request LLM timeout in seconds
+        llm_policy: Decides which interfaces are sent to the LLM
+                    (None to send every interface)
+        use_llm_cache: Serve unchanged interfaces from the persistent LLM cache
+        llm_cache_dir: LLM cache directory (None for the default)
+        incremental: Only re-analyze files changed since the last run
+        manifest_file: Manifest path for incremental mode
+                       (None for <output_file>.manifest.json)
+        jobs: Number of parser processes (0 for all cores)
+        backend: Parser backend ("basic" or "tree-sitter")
+        include_patterns: gitignore-style patterns headers must match
+        use_git: List headers with git ls-files instead of walking the tree
+        scan_workers: Threads scanning top-level directories in parallel
+        store_file: Also write the results to this indexed SQLite store
+                    (None to write only the table)
+        output_format: Table format, one of table_generator.WRITERS
+        shard_by: "directory" or "namespace", for "markdown-shards"
+        symbol_index_file: Also save a symbol index with the inheritance
+                           graph to this file (None to skip)
+        include_graph_file: Also save the include dependency graph to this
+                            file (None to skip)
     """
     print("=" * 60)
     print("C++ Interface Analyzer - Phase 1")
     print("=" * 60)
     print(f"\nScanning project: {project_path}")
     
-    # Step 1: Find header files
+    # Step 1: Find header files (lazily; files stream through every stage)
     print("\n[1/4] Scanning for header files...")
-    header_files = find_header_files(project_path, exclude_dirs=exclude_dirs)
+    header_stream = iter_header_files(
+        project_path,
+        exclude=exclude_dirs,
+        include=include_patterns,
+        workers=scan_workers,
+        use_git=use_git
+    )
     
-    if not header_files:
+    first = next(header_stream, None)
+    if first is None:
         print("❌ No header files found!")
         return
-    
-    print(f"✅ Found {len(header_files)} header files")
+    header_stream = itertools.chain([first], header_stream)
     
     if max_files:
-        header_files = header_files[:max_files]
-        print(f"   Analyzing first {len(header_files)} files")
+        header_stream = itertools.islice(header_stream, max_files)
+        print(f"   Analyzing first {max_files} files")
+    
+    manifest = None
+    if incremental:
+        schema = "phase1" if backend == "basic" else f"phase1-{backend}"
+        manifest = FileManifest(manifest_file or output_file + ".manifest.json", schema=schema,
+                                load=FileRecord.from_dict)
+    
+    # Running totals, accumulated as files stream past
+    stats = {'found': 0, 'parsed': 0}
+    seen_paths = set()  # Relative paths, for pruning the manifest
+    
+    def scanned_files():
+        for file_info in header_stream:
+            stats['found'] += 1
+            if manifest:
+                seen_paths.add(file_info['relative_path'])
+            yield file_info
     
     # Step 2: Parse files
     print("\n[2/4] Parsing header files...")
-    parsed_data_list = []
-    
-    for i, file_info in enumerate(header_files, 1):
-        print(f"   [{i}/{len(header_files)}] {file_info['relative_path']}")
-        
-        content = get_file_content(file_info['path'])
-        if not content:
-            continue
-        
+    if backend != "basic":
+        # Fail early (in this process) if the backend is not installed
         try:
-            parsed = parse_header_file(file_info['relative_path'], content)
-            parsed_data_list.append(parsed)
-        except Exception as e:
-            print(f"      ⚠️  Error parsing: {e}")
-            continue
+            get_parse_function(backend)("", "")
+        except ImportError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        print(f"   Using {backend} parser")
+    if jobs != 1:
+        print(f"   Using {jobs or 'all'} parser processes")
     
-    total_interfaces = sum(d['interface_count'] for d in parsed_data_list)
-    print(f"✅ Parsed {len(parsed_data_list)} files, found {total_interfaces} interfaces")
+    def lookup(file_info):
+        return manifest.lookup(file_info['relative_path'], file_info['path'])
+    
+    def parsed_files():
+        """Yield (parsed data, content, file_info, includes) in scan order."""
+        results = parse_files(scanned_files(), jobs=jobs, backend=backend,
+                              lookup=lookup if manifest else None)
+        for file_info, parsed, error, content in results:
+            relative_path = file_info['relative_path']
+            if content is None:
+                # Unchanged since the last run. The manifest holds the parse
+                # from before the LLM, so it is enhanced again (mostly from
+                # the LLM cache) and follows the current LLM settings
+                includes = manifest.includes(relative_path)
+                if session or (include_graph and includes is None):
+                    content = get_file_content(file_info['path'])
+                if include_graph and includes is None:
+                    includes = scan_includes(content)
+                yield parsed, content or "", file_info, includes
+                continue
+            
+            stats['parsed'] += 1
+            print(f"   [{stats['parsed']}] {relative_path}")
+            
+            if error:
+                print(f"      ⚠️  Error parsing: {error}")
+                continue
+            if parsed is None:
+                continue
+            
+            includes = scan_includes(content) if manifest or include_graph else None
+            if manifest:
+                manifest.update(relative_path, file_info['path'], content, parsed, includes=includes)
+            yield parsed, content, file_info, includes
     
     # Step 3: LLM enhancement (optional)
-    print("\n[3/4] Enhancing descriptions with LLM...")
-    if use_local_llm:
-        print("   Using local LLM (Ollama)")
+    session = None
+    if not use_llm:
+        print("\n[3/4] Skipping LLM enhancement (--no-llm)")
     else:
-        print("   Using cloud LLM (OpenAI)")
-    
-    enhanced_data_list = []
-    for i, parsed_data in enumerate(parsed_data_list, 1):
-        file_path = parsed_data['file_path']
-        print(f"   [{i}/{len(parsed_data_list)}] Enhancing {file_path}")
+        print("\n[3/4] Enhancing descriptions with LLM...")
+        if use_local_llm:
+            print("   Using local LLM (Ollama)")
+        else:
+            print("   Using cloud LLM (OpenAI)")
         
-        # Get file content again for LLM analysis
-        full_path = None
-        for file_info in header_files:
-            if file_info['relative_path'] == file_path:
-                full_path = file_info['path']
-                break
+        print(f"   Up to {llm_concurrency} concurrent requests")
+        if llm_batch_tokens:
+            print(f"   Batching interfaces per file, up to ~{llm_batch_tokens} prompt tokens")
         
-        if full_path:
-            content = get_file_content(full_path)
-            try:
-                enhanced = analyze_interfaces(parsed_data, content, use_local=use_local_llm)
-                enhanced_data_list.append(enhanced)
-            except Exception as e:
-                print(f"      ⚠️  LLM error: {e}, using basic descriptions")
-                enhanced_data_list.append(parsed_data)
-        else:
-            enhanced_data_list.append(parsed_data)
+        # One client (and connection pool) for every request of the run
+        session = open_llm_session(use_local_llm, timeout=llm_timeout, max_connections=llm_concurrency)
+    
+    # Step 4: Generate table, one file at a time
+    print(f"\n[4/4] Writing {output_format} output to {output_file}...")
     
-    print("✅ Enhanced descriptions")
+    cache = LLMCache(llm_cache_dir) if use_llm_cache and session else None
+    symbols = SymbolIndex() if symbol_index_file else None
+    include_graph = IncludeGraph() if include_graph_file else None
+    try:
+        enhanced = enhance_stream(
+            parsed_files(),
+            session,
+            concurrency=llm_concurrency,
+            rate_limit=llm_rate_limit,
+            retries=llm_retries,
+            cache=cache,
+            batch_tokens=llm_batch_tokens,
+            select=llm_policy.needs_llm if llm_policy else None
+        )
+        with open_writer(output_file, output_format, shard_by) as writer, \
+                (ResultStoreWriter(store_file) if store_file else contextlib.nullcontext()) as store:
+            for parsed_data, content, file_info, includes in enhanced:
+                if include_graph:
+                    include_graph.add_file(file_info['relative_path'], includes or [])
+                writer.add_file(parsed_data)
+                if store:
+                    store.add_file(parsed_data)
+                if symbols:
+                    symbols.add_file(parsed_data)
+            total_interfaces = writer.total
+    finally:
+        if session:
+            session.close()
+        if cache:
+            cache.close()
     
-    # Step 4: Generate table
-    print("\n[4/4] Generating markdown table...")
-    table_content = generate_markdown_table(enhanced_data_list, output_file)
+    print(f"✅ Found {stats['found']} header files, parsed {stats['parsed']}")
+    if llm_policy and session:
+        print(f"   {llm_policy.report()}")
+    if manifest:
+        print(f"   Reused {manifest.reused} unchanged files from {manifest.path}")
+        removed = manifest.prune(seen_paths)
+        manifest.save()
+        print(f"   Manifest: {manifest.updated} updated, {removed} removed")
     
     print(f"✅ Analysis complete!")
     print(f"\n📊 Results written to: {output_file}")
+    if store_file:
+        print(f"   Result store: {store_file}")
+    if symbols:
+        symbols.save(symbol_index_file)
+        print(f"   Symbol index: {symbol_index_file} ({len(symbols.symbols)} classes, "
+              f"{symbols.edge_count} inheritance edges)")
+    if include_graph:
+        include_graph.save(include_graph_file)
+        print(f"   Include graph: {include_graph_file} ({len(include_graph.files)} headers, "
+              f"{include_graph.edge_count} project includes)")
     print(f"   Total interfaces: {total_interfaces}")
     print("\n" + "=" * 60)
 
@@ -124,13 +268,45 @@ def main():
     parser.add_argument(
         "-o", "--output",
         default="interfaces_table.md",
-        help="Output markdown file (default: interfaces_table.md)"
+        help="Output file, or directory for --format markdown-shards (default: interfaces_table.md)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(WRITERS),
+        default="markdown",
+        help="Output format: one markdown table, JSON Lines, CSV, or one markdown "
+             "table per directory/namespace plus index.md (default: markdown)"
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=SHARD_KEYS,
+        default="directory",
+        help="How --format markdown-shards splits the table (default: directory)"
+    )
+    parser.add_argument(
+        "--store",
+        help="Also write the results to an indexed SQLite store (e.g. interfaces.sqlite3)"
+    )
+    parser.add_argument(
+        "--symbol-index",
+        help="Also save a symbol index with the inheritance graph (e.g. symbols.json), "
+             "queried with symbol_index.py"
+    )
+    parser.add_argument(
+        "--include-graph",
+        help="Also save the include dependency graph (e.g. includes.json), "
+             "queried with include_graph.py --affected/--order"
     )
     parser.add_argument(
         "--cloud",
         action="store_true",
         help="Use cloud LLM (OpenAI) instead of local (Ollama)"
     )
+    parser.add_argument(
+        "--no-llm",
+        action="store_true",
+        help="Skip LLM enhancement and keep the parsed descriptions (fast startup)"
+    )
     parser.add_argument(
         "--max-files",
         type=int,
@@ -139,7 +315,110 @@ def main():
     parser.add_argument(
         "--exclude",
         nargs="+",
-        help="Additional directories to exclude"
+        help="Additional directories or gitignore-style patterns to exclude "
+             "(e.g. 'out-*/' '/third_party' '*.pb.h')"
+    )
+    parser.add_argument(
+        "--include",
+        nargs="+",
+        help="Only analyze headers matching these gitignore-style patterns (e.g. 'src/**')"
+    )
+    parser.add_argument(
+        "--git-files",
+        action="store_true",
+        help="List headers with git ls-files (tracked and untracked, skipping git-ignored files)"
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        help="Threads scanning top-level directories in parallel (default: 1)"
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent LLM requests (default: 4)"
+    )
+    parser.add_argument(
+        "--llm-rate-limit",
+        type=float,
+        help="Maximum LLM requests per second (default: per-provider)"
+    )
+    parser.add_argument(
+        "--llm-retries",
+        type=int,
+        default=3,
+        help="Retries per LLM request with exponential backoff (default: 3)"
+    )
+    parser.add_argument(
+        "--llm-timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Per-request LLM timeout in seconds (default: {DEFAULT_TIMEOUT:g})"
+    )
+    parser.add_argument(
+        "--llm-batch",
+        action="store_true",
+        help="Describe several interfaces of a file per LLM request (JSON answer)"
+    )
+    parser.add_argument(
+        "--llm-batch-tokens",
+        type=int,
+        default=DEFAULT_BATCH_TOKENS,
+        help=f"Estimated prompt token budget per batched request (default: {DEFAULT_BATCH_TOKENS})"
+    )
+    parser.add_argument(
+        "--llm-all",
+        action="store_true",
+        help="Send every interface to the LLM, including documented ones and plain data structs"
+    )
+    parser.add_argument(
+        "--llm-min-doc-words",
+        type=int,
+        default=DEFAULT_MIN_DOC_WORDS,
+        help=f"Keep existing descriptions of at least this many words (default: {DEFAULT_MIN_DOC_WORDS}, 0 to disable)"
+    )
+    parser.add_argument(
+        "--llm-min-methods",
+        type=int,
+        default=0,
+        help="Only describe interfaces with at least this many public methods (default: 0)"
+    )
+    parser.add_argument(
+        "--llm-skip",
+        nargs="+",
+        help="gitignore-style patterns of headers never sent to the LLM (e.g. 'vendor/**' '*_regs.h')"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Always query the LLM instead of reusing cached descriptions"
+    )
+    parser.add_argument(
+        "--llm-cache-dir",
+        help="Directory for the LLM description cache (default: ~/.cache/cpp-interface-analyzer)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only re-analyze headers changed since the last run"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Manifest file for --incremental (default: <output>.manifest.json)"
+    )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of parser processes, 0 for all cores (default: 1)"
+    )
+    parser.add_argument(
+        "--parser",
+        choices=BACKENDS,
+        default="basic",
+        help="Parser backend (default: basic)"
     )
     
     args = parser.parse_args()
@@ -154,8 +433,33 @@ def main():
         project_path=str(project_path),
         output_file=args.output,
         use_local_llm=not args.cloud,
+        use_llm=not args.no_llm,
         max_files=args.max_files,
-        exclude_dirs=args.exclude
+        exclude_dirs=args.exclude,
+        llm_concurrency=args.llm_concurrency,
+        llm_rate_limit=args.llm_rate_limit,
+        llm_retries=args.llm_retries,
+        llm_batch_tokens=args.llm_batch_tokens if args.llm_batch else 0,
+        llm_timeout=args.llm_timeout,
+        llm_policy=None if args.llm_all else LLMPolicy(
+            min_doc_words=args.llm_min_doc_words,
+            min_methods=args.llm_min_methods,
+            skip_paths=args.llm_skip
+        ),
+        use_llm_cache=not args.no_llm_cache,
+        llm_cache_dir=args.llm_cache_dir,
+        incremental=args.incremental,
+        manifest_file=args.manifest,
+        jobs=args.jobs,
+        backend=args.parser,
+        include_patterns=args.include,
+        use_git=args.git_files,
+        scan_workers=args.scan_workers,
+        store_file=args.store,
+        output_format=args.format,
+        shard_by=args.shard_by,
+        symbol_index_file=args.symbol_index,
+        include_graph_file=args.include_graph
     )
 
 
@@ -4,131 +4,380 @@ Extracts basic information from C++ header files using simple parsing.
 """
 
 import re
-from typing import List, Dict, Optional
+from bisect import bisect_right
+from typing import List, Optional
+
+from records import FileRecord, InterfaceRecord, MethodRecord
+
+
+NAMESPACE_PATTERN = re.compile(r'namespace\s+([a-zA-Z_][a-zA-Z0-9_]*(?:::[a-zA-Z_][a-zA-Z0-9_]*)*)')
 
 
 def extract_namespace(content: str) -> Optional[str]:
     """Extract namespace from file content."""
     # Look for namespace declarations
-    namespace_pattern = r'namespace\s+([a-zA-Z_][a-zA-Z0-9_]*(?:::[a-zA-Z_][a-zA-Z0-9_]*)*)'
-    matches = re.findall(namespace_pattern, content)
+    matches = NAMESPACE_PATTERN.findall(content)
     if matches:
         return '::'.join(matches)  # Return nested namespaces
     return None
 
 
-def extract_classes_and_structs(content: str) -> List[Dict[str, any]]:
+# Spans that may contain braces but carry no structure: comments, string and
+# char literals (including raw strings) and preprocessor lines (outside those
+# spans, '#' only ever starts a directive).
+_SKIP = r'''
+      //[^\n]* | /\*.*?\*/
+    | \#(?:\\\n|[^\n])*
+    | R"(?P<delim>[^(\s"]*)\(.*?\)(?P=delim)" | "(?:\\.|[^"\\\n])*" | '(?:\\.|[^'\\\n]){0,10}'
+'''
+
+# Structural scan: only braces, semicolons and colons are reported; everything
+# in _SKIP is consumed whole so braces inside it never reach the scanner. The
+# leading lookahead lets the regex engine skip plain code without trying every
+# alternative. Char literals are bounded so digit separators (1'000) cannot
+# pair up across code.
+STRUCTURE_PATTERN = re.compile(r'''
+    (?=[/\#R"'{};:])
+    (?: (?P<skip>''' + _SKIP + r''')
+    | (?P<open>\{) | (?P<close>\}) | (?P<semi>;) | (?P<scope>::) | (?P<colon>:) )
+''', re.DOTALL | re.VERBOSE)
+
+# Statement tokenizer, run only over statements that may declare something
+TOKEN_PATTERN = re.compile(r'''
+      (?P<skip>''' + _SKIP + r''')
+    | (?P<number>\.?\d[\w.']*)
+    | (?P<ident>[A-Za-z_]\w*)
+    | (?P<punct>::|[{}();:<>,~\[\]=*&+\-!%^|/.?])
+''', re.DOTALL | re.VERBOSE)
+
+# Documentation comments: /** ... */ blocks and /// lines. Other comments and
+# string literals are matched only so that markers inside them are ignored.
+COMMENT_PATTERN = re.compile(r'''
+    (?=[/R"'])
+    (?: /\*\*(?!/)\s*(?P<block>.*?)\s*\*/
+    | ///[ \t]*(?P<line>[^\n]*)
+    | //[^\n]* | /\*.*?\*/
+    | R"(?P<delim>[^(\s"]*)\(.*?\)(?P=delim)" | "(?:\\.|[^"\\\n])*" | '(?:\\.|[^'\\\n]){0,10}' )
+''', re.DOTALL | re.VERBOSE)
+
+# A class's description must start within this many characters before it
+DESCRIPTION_WINDOW = 500
+MAX_DESCRIPTION_LENGTH = 200
+
+CLASS_KEYS = {'class', 'struct'}
+ACCESS_KEYWORDS = {'public', 'protected', 'private'}
+ATTRIBUTE_KEYWORDS = {'alignas', '__attribute__', '__declspec'}
+NON_METHOD_STATEMENTS = {'typedef', 'using', 'static_assert', 'friend', 'enum'}
+
+
+def tokenize(content: str, start: int = 0, end: int = None) -> List:
+    """Return (kind, text, position) for each significant token in content[start:end]."""
+    end = len(content) if end is None else end
+    return [(m.lastgroup, m.group(), m.start())
+            for m in TOKEN_PATTERN.finditer(content, start, end)
+            if m.lastgroup != 'skip']
+
+
+def _skip_balanced(tokens: List, i: int, open_tok: str, close_tok: str) -> int:
+    """Return the index just past the group opened at tokens[i]."""
+    depth = 0
+    while i < len(tokens):
+        text = tokens[i][1]
+        if text == open_tok:
+            depth += 1
+        elif text == close_tok:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _parse_class_head(tokens: List):
+    """
+    Recognize a class/struct head in the tokens of one statement.
+
+    Returns (keyword token, name, bases) or None if the statement is not a
+    class definition head (e.g. a function returning a struct, an enum class).
+    """
+    # The last class key outside template parameter lists
+    key_index = None
+    angle = 0
+    for i, (kind, text, _) in enumerate(tokens):
+        if text == '<':
+            angle += 1
+        elif text == '>':
+            angle = max(0, angle - 1)
+        elif text in CLASS_KEYS and angle == 0 and not (i and tokens[i - 1][1] == 'enum'):
+            key_index = i
+    if key_index is None:
+        return None
+
+    i = key_index + 1
+    name = None
+    while i < len(tokens):
+        kind, text, _ = tokens[i]
+        if text == '[':
+            i = _skip_balanced(tokens, i, '[', ']')
+        elif text in ATTRIBUTE_KEYWORDS:
+            i = _skip_balanced(tokens, i + 1, '(', ')')
+        elif kind == 'ident' and text != 'final':
+            # Export macros precede the name, so the last identifier wins
+            name = text
+            i += 1
+        elif text == '::':
+            i += 1
+        elif text == '<' and name:
+            i = _skip_balanced(tokens, i, '<', '>')
+        elif text == 'final':
+            i += 1
+        else:
+            break
+
+    if not name:
+        return None
+    if i == len(tokens):
+        return tokens[key_index], name, []
+    if tokens[i][1] != ':':
+        return None
+
+    bases = []
+    current = []
+    angle = 0
+    for kind, text, _ in tokens[i + 1:]:
+        if text == '<':
+            angle += 1
+        elif text == '>':
+            angle -= 1
+        if text == ',' and angle == 0:
+            bases.append(''.join(current))
+            current = []
+        elif not (angle == 0 and text in ACCESS_KEYWORDS | {'virtual'}):
+            current.append(text)
+    if current:
+        bases.append(''.join(current))
+    return tokens[key_index], name, bases
+
+
+def _method_name(tokens: List) -> Optional[str]:
+    """Return the member function name declared by a statement, or None."""
+    if not tokens or tokens[0][1] in NON_METHOD_STATEMENTS:
+        return None
+    angle = 0
+    for i, (kind, text, _) in enumerate(tokens):
+        if text == 'operator':
+            return 'operator' + ''.join(t[1] for t in tokens[i + 1:]).split('(')[0]
+        if text == '<':
+            angle += 1
+        elif text == '>':
+            angle = max(0, angle - 1)
+        elif text == '(' and angle == 0:
+            if i == 0 or tokens[i - 1][0] != 'ident':
+                return None
+            if i + 1 < len(tokens) and tokens[i + 1][1] in ('*', '&'):
+                return None  # Function pointer member
+            name = tokens[i - 1][1]
+            if i >= 2 and tokens[i - 2][1] == '~':
+                name = '~' + name
+            return name
+    return None
+
+
+def scan_structure(content: str) -> List[InterfaceRecord]:
+    """
+    Scan C++ code once and return every class/struct definition.
+
+    A scope stack tracks namespaces, classes and other braces, so each
+    interface gets its enclosing namespace, body range, access sections and
+    member functions (with access) in a single O(n) pass. Only statements
+    that can declare a scope, a member function or an access label are
+    tokenized, each exactly once.
+    """
+    interfaces = []
+    scopes = []          # (kind, name or open class scope)
+    statement_start = 0  # Position after the last '{', '}', ';' or access label
+
+    def current_class():
+        return scopes[-1][1] if scopes and scopes[-1][0] == 'class' else None
+
+    for match in STRUCTURE_PATTERN.finditer(content):
+        kind = match.lastgroup
+        if kind == 'skip' or kind == 'delim' or kind == 'scope':
+            continue
+        pos = match.start()
+        segment = content[statement_start:pos]
+        owner = current_class()
+
+        if kind == 'open':
+            statement = None
+            if 'namespace' in segment or 'class' in segment or 'struct' in segment:
+                statement = tokenize(content, statement_start, pos)
+            if statement and any(t[1] == 'namespace' for t in statement[:2]):
+                name = ''.join(t[1] for t in statement if t[1] not in ('namespace', 'inline'))
+                scopes.append(('namespace', name))
+            elif statement and _parse_class_head(statement):
+                key, name, bases = _parse_class_head(statement)
+                interface = InterfaceRecord(
+                    name=name,
+                    type=key[1],
+                    namespace='::'.join(n for k, n in scopes if k == 'namespace' and n) or None,
+                    bases=bases,
+                    access_sections=[],
+                    description='',
+                    start_pos=key[2],
+                    end_pos=len(content),
+                    parent=owner.interface.name if owner is not None else None,
+                )
+                interfaces.append(interface)
+                scopes.append(('class', _ClassScope(interface, key[1], pos + 1)))
+            else:
+                if owner is not None and '(' in segment:
+                    _record_method(owner, statement or tokenize(content, statement_start, pos))
+                scopes.append(('block', None))
+
+        elif kind == 'close':
+            if scopes:
+                scope_kind, scope = scopes.pop()
+                if scope_kind == 'class':
+                    _close_section(scope, content, pos)
+                    scope.interface.end_pos = pos + 1
+
+        elif kind == 'semi':
+            if owner is not None and '(' in segment:
+                _record_method(owner, tokenize(content, statement_start, pos))
+
+        elif kind == 'colon':
+            if owner is None or not ('public' in segment or 'protected' in segment or 'private' in segment):
+                continue
+            statement = tokenize(content, statement_start, pos)
+            if len(statement) != 1 or statement[0][1] not in ACCESS_KEYWORDS:
+                continue
+            _close_section(owner, content, statement[0][2])
+            owner.access = statement[0][1]
+            owner.section_start = pos + 1
+
+        statement_start = pos + 1
+
+    # Close interfaces left open by unbalanced braces
+    for scope_kind, scope in scopes:
+        if scope_kind == 'class':
+            _close_section(scope, content, len(content))
+
+    return interfaces
+
+
+class _ClassScope:
+    """A class body being scanned: its record and the current access section."""
+
+    __slots__ = ('interface', 'access', 'section_start')
+
+    def __init__(self, interface: InterfaceRecord, key: str, section_start: int):
+        self.interface = interface
+        self.access = 'private' if key == 'class' else 'public'
+        self.section_start = section_start
+
+
+def _close_section(scope: _ClassScope, content: str, end: int):
+    """Record the access section ending at end, unless it is empty."""
+    start = scope.section_start
+    if content[start:end].strip():
+        scope.interface.access_sections.append((scope.access, start, end))
+
+
+def _record_method(scope: _ClassScope, statement: List):
+    """Add the member function declared by a class-level statement, if any."""
+    name = _method_name(statement)
+    if name is not None:
+        scope.interface.methods.append(MethodRecord(name, scope.access))
+
+
+def extract_classes_and_structs(content: str) -> List[InterfaceRecord]:
     """
     Extract class and struct definitions from C++ code.
     Returns basic information about each interface.
     """
-    interfaces = []
-    
-    # Pattern to match class/struct definitions
-    # Matches: class/struct name, inheritance, and basic structure
-    pattern = r'(?:class|struct)\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*(?::\s*[^{]*)?\{'
-    
-    matches = re.finditer(pattern, content, re.MULTILINE)
-    
-    for match in matches:
-        interface_name = match.group(1)
-        
-        # Count public methods (simple heuristic: count function declarations)
-        # Look for public: section and count methods after it
-        start_pos = match.end()
-        
-        # Find the matching closing brace
-        brace_count = 1
-        end_pos = start_pos
-        while end_pos < len(content) and brace_count > 0:
-            if content[end_pos] == '{':
-                brace_count += 1
-            elif content[end_pos] == '}':
-                brace_count -= 1
-            end_pos += 1
-        
-        # Extract the class body
-        class_body = content[start_pos:end_pos] if end_pos < len(content) else ""
-        
-        # Count public methods (functions ending with ; or {)
-        # This is a simple heuristic - counts function-like declarations
-        method_pattern = r'[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*(?:const)?\s*(?:;|\{)'
-        methods = re.findall(method_pattern, class_body)
-        public_method_count = len(methods)
-        
+    interfaces = scan_structure(content)
+    comments = CommentIndex(content) if interfaces else None
+    for interface in interfaces:
         # Extract description from comments before the class
-        description = extract_description_before_class(content, match.start())
-        
-        interfaces.append({
-            'name': interface_name,
-            'type': 'class' if 'class' in match.group(0) else 'struct',
-            'public_method_count': public_method_count,
-            'description': description,
-            'start_pos': match.start(),
-            'end_pos': end_pos
-        })
-    
+        interface['description'] = comments.description_before(interface['start_pos'])
     return interfaces
 
 
-def extract_description_before_class(content: str, class_pos: int) -> str:
-    """Extract comment-based description before a class definition."""
-    # Look backwards from class position for comments
-    before_class = content[max(0, class_pos - 500):class_pos]
-    
-    # Look for Doxygen-style comments or regular comments
-    # Pattern for /** ... */ or /// comments
-    doxygen_pattern = r'/\*\*\s*(.*?)\s*\*/'
-    single_line_pattern = r'///\s*(.*?)(?:\n|$)'
-    
-    # Try to find the most recent comment block
-    doxygen_match = list(re.finditer(doxygen_pattern, before_class, re.DOTALL))
-    single_line_matches = list(re.finditer(single_line_pattern, before_class))
-    
-    description = ""
-    
-    if doxygen_match:
-        # Get the last (most recent) match
-        last_match = doxygen_match[-1]
-        desc_text = last_match.group(1)
-        # Clean up the description
-        description = ' '.join(line.strip().lstrip('*').strip() 
-                              for line in desc_text.split('\n') 
-                              if line.strip())
-    elif single_line_matches:
-        # Get consecutive single-line comments
-        last_match = single_line_matches[-1]
-        desc_lines = []
-        for match in reversed(single_line_matches):
-            if match.end() <= last_match.end():
-                line = match.group(1).strip()
-                if line:
-                    desc_lines.insert(0, line)
-        description = ' '.join(desc_lines)
-    
-    # Limit description length
-    if len(description) > 200:
-        description = description[:197] + "..."
-    
-    return description
+class CommentIndex:
+    """
+    Documentation comments of one file, sorted by position.
+
+    Built in a single pass over the file, so finding the comment before a
+    class is a bisect instead of a regex scan of the text before it. A run
+    of /// lines separated only by whitespace counts as one comment.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self.starts = []
+        self.ends = []
+        self.texts = []      # Raw text of the comment
+        self.is_line = []    # True for a /// line, False for a /** */ block
+        for match in COMMENT_PATTERN.finditer(content):
+            kind = match.lastgroup
+            if kind == 'block' or kind == 'line':
+                self.starts.append(match.start())
+                self.ends.append(match.end())
+                self.texts.append(match.group(kind))
+                self.is_line.append(kind == 'line')
+
+    def description_before(self, class_pos: int) -> str:
+        """Return the cleaned-up nearest documentation comment before class_pos."""
+        i = bisect_right(self.ends, class_pos) - 1
+        window_start = class_pos - DESCRIPTION_WINDOW
+        if i < 0 or self.starts[i] < window_start:
+            return ""
 
+        if not self.is_line[i]:
+            description = ' '.join(line.strip().lstrip('*').strip()
+                                   for line in self.texts[i].split('\n')
+                                   if line.strip())
+        else:
+            # Walk back over the consecutive /// lines
+            first = i
+            while (first > 0 and self.is_line[first - 1] and self.starts[first - 1] >= window_start
+                   and not self.content[self.ends[first - 1]:self.starts[first]].strip()):
+                first -= 1
+            description = ' '.join(text.strip() for text in self.texts[first:i + 1] if text.strip())
 
-def parse_header_file(file_path: str, content: str) -> Dict[str, any]:
+        # Limit description length
+        if len(description) > MAX_DESCRIPTION_LENGTH:
+            description = description[:MAX_DESCRIPTION_LENGTH - 3] + "..."
+
+        return description
+
+
+def extract_description_before_class(content: str, class_pos: int,
+                                     comments: CommentIndex = None) -> str:
+    """
+    Extract comment-based description before a class definition.
+
+    Pass the file's CommentIndex when describing several classes of the
+    same file; otherwise one is built for the text before class_pos.
+    """
+    if comments is None:
+        comments = CommentIndex(content[max(0, class_pos - DESCRIPTION_WINDOW):class_pos])
+        class_pos = min(class_pos, DESCRIPTION_WINDOW)
+    return comments.description_before(class_pos)
+
+
+def parse_header_file(file_path: str, content: str) -> FileRecord:
     """
     Parse a C++ header file and extract interface information.
     
     Returns:
-        Dictionary with file info and extracted interfaces
+        FileRecord with file info and extracted interfaces (readable like a dict)
     """
     namespace = extract_namespace(content)
     interfaces = extract_classes_and_structs(content)
     
-    return {
-        'file_path': file_path,
-        'namespace': namespace,
-        'interfaces': interfaces,
-        'interface_count': len(interfaces)
-    }
+    return FileRecord(file_path, namespace, interfaces)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+"""
+Startup-time benchmark for the phase1 CLI
+Times `analyzer.py --help` and a `--no-llm` run on a tiny generated project,
+and checks that no LLM library is imported when the LLM stage is off.
+
+Usage:
+    python benchmark_startup.py --repeat 5 --max-seconds 1.0
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ANALYZER = str(Path(__file__).parent / "analyzer.py")
+
+# Top-level modules that must not be imported by a --no-llm run
+LLM_MODULES = ('langchain', 'langchain_core', 'langchain_ollama', 'langchain_openai',
+               'openai', 'ollama', 'httpx', 'tiktoken')
+
+SAMPLE_HEADER = """#pragma once
+namespace hal {
+/** GPIO pin driver used by the startup benchmark */
+class Gpio {
+public:
+    void write(bool value);
+    bool read() const;
+};
+}
+"""
+
+
+def time_command(args, repeat: int):
+    """Return the best wall time in seconds for running a command."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def imported_llm_modules(args):
+    """Run a command with -X importtime and return the LLM modules it imported."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    found = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        module = line.rsplit('|', 1)[-1].strip()
+        if module.split('.')[0] in LLM_MODULES:
+            found.add(module.split('.')[0])
+    return sorted(found)
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark phase1 CLI startup")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per command (best is reported)")
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help="Exit with an error if a --no-llm run takes longer than this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as project:
+        with open(os.path.join(project, 'gpio.h'), 'w', encoding='utf-8') as f:
+            f.write(SAMPLE_HEADER)
+        output = os.path.join(project, 'interfaces.md')
+        no_llm_run = [ANALYZER, project, '-o', output, '--no-llm']
+
+        print(f"Benchmarking phase1 startup, best of {args.repeat}")
+        baseline = time_command([sys.executable, '-c', 'pass'], args.repeat)
+        help_time = time_command([sys.executable, ANALYZER, '--help'], args.repeat)
+        run_time = time_command([sys.executable] + no_llm_run, args.repeat)
+        print(f"  {'python':10} {baseline:7.3f}s")
+        print(f"  {'--help':10} {help_time:7.3f}s")
+        print(f"  {'--no-llm':10} {run_time:7.3f}s")
+
+        leaked = imported_llm_modules(no_llm_run)
+
+    failed = False
+    if leaked:
+        print(f"❌ --no-llm run imported LLM libraries: {', '.join(leaked)}")
+        failed = True
+    else:
+        print("✅ --no-llm run imported no LLM libraries")
+    if args.max_seconds is not None and run_time > args.max_seconds:
+        print(f"❌ --no-llm run took {run_time:.3f}s (limit {args.max_seconds:.3f}s)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
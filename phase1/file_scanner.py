@@ -1,52 +1,284 @@
 """
 File Scanner for C++ Header Files
-Scans a directory and finds all C++ header files (.h, .hpp)
+Scans a directory and finds all C++ header files (.h, .hpp), shared by
+phase1 and phase2.
 """
 
 import os
+import re
 from pathlib import Path
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
 
 
-def find_header_files(directory: str, exclude_dirs: List[str] = None) -> List[Dict[str, str]]:
+DEFAULT_EXCLUDE_DIRS = ['.git', 'build', 'cmake-build', 'node_modules',
+                        'venv', '__pycache__', '.vscode', '.idea']
+
+# Header file extensions
+HEADER_EXTENSIONS = {'.h', '.hpp', '.hxx', '.hh'}
+
+# An exclude pattern that is just a file or directory name
+NAME_PATTERN = re.compile(r'[^/*?\[\]!#\\]+/?')
+
+
+def _pattern_regex(pattern: str) -> str:
+    """Translate the body of a gitignore-style glob into a regex."""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            parts.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            parts.append('/.*')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            parts.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            parts.append('[^/]*')
+        elif c == '?':
+            parts.append('[^/]')
+        elif c == '[':
+            close = pattern.find(']', i + 2)
+            if close == -1:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = close
+        elif c == '\\' and i + 1 < len(pattern):
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return ''.join(parts)
+
+
+class PathFilter:
     """
-    Find all C++ header files in the given directory.
+    gitignore-style include/exclude matching on '/'-separated relative paths.
+    
+    Exclude patterns follow .gitignore rules: a pattern without a slash
+    matches a name at any depth, a leading or inner slash anchors it to the
+    scan root, a trailing slash matches directories only, '**' matches any
+    number of directories, '!' re-includes, and the last matching pattern
+    wins. When include patterns are given, a file must match one of them.
+    """
+    
+    def __init__(self, exclude: Iterable[str] = (), include: Iterable[str] = ()):
+        exclude = [pattern.strip() for pattern in exclude]
+        self.exclude = [rule for rule in map(self._compile, exclude) if rule]
+        self.include = [rule for rule in map(self._compile, include) if rule]
+        # Plain names (the common case) are matched with set lookups
+        self._names = self._dir_names = None
+        if all(NAME_PATTERN.fullmatch(pattern) for pattern in exclude if pattern):
+            self._names = {p for p in exclude if p and not p.endswith('/')}
+            self._dir_names = {p.rstrip('/') for p in exclude if p.endswith('/')}
+    
+    @staticmethod
+    def _compile(pattern: str):
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith('#'):
+            return None
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        prefix = '' if anchored else '(?:.*/)?'
+        return re.compile(prefix + _pattern_regex(pattern) + '$'), negate, dir_only
+    
+    @staticmethod
+    def _matches(rules, path: str, is_dir: bool) -> Optional[bool]:
+        result = None
+        for regex, negate, dir_only in rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(path):
+                result = not negate
+        return result
+    
+    def is_excluded(self, path: str, is_dir: bool) -> bool:
+        """True if the path itself matches the exclude patterns."""
+        if self._names is not None:
+            name = path.rsplit('/', 1)[-1]
+            return name in self._names or (is_dir and name in self._dir_names)
+        return bool(self._matches(self.exclude, path, is_dir))
+    
+    def is_included(self, path: str) -> bool:
+        """True if a file passes the include patterns."""
+        return not self.include or bool(self._matches(self.include, path, False))
+    
+    def accepts(self, path: str) -> bool:
+        """Check a file and all of its parent directories, for flat file lists."""
+        parts = path.split('/')
+        for i in range(1, len(parts)):
+            if self.is_excluded('/'.join(parts[:i]), True):
+                return False
+        return not self.is_excluded(path, False) and self.is_included(path)
+
+
+def _file_info(directory: str, relative_path: str, name: str) -> Dict[str, str]:
+    return {
+        'path': os.path.join(directory, relative_path),
+        'relative_path': relative_path,
+        'filename': name
+    }
+
+
+def _entries(directory: str, relative: str, path_filter: PathFilter, extensions) -> List:
+    """Return the sorted (sort key, name) entries of one directory that pass the filter."""
+    entries = []
+    try:
+        with os.scandir(os.path.join(directory, relative) if relative else directory) as it:
+            for entry in it:
+                name = entry.name
+                try:
+                    is_dir = entry.is_dir()
+                    if is_dir and entry.is_symlink():
+                        continue  # Like os.walk, never follow directory links
+                except OSError:
+                    continue
+                if not is_dir and os.path.splitext(name)[1] not in extensions:
+                    continue
+                key = relative.replace(os.sep, '/') + name
+                if path_filter.is_excluded(key, is_dir):
+                    continue
+                if is_dir:
+                    # Directories sort as if their names ended in a separator
+                    entries.append((name + os.sep, name))
+                elif path_filter.is_included(key):
+                    entries.append((name, name))
+    except OSError:
+        pass
+    entries.sort()
+    return entries
+
+
+def _walk(directory: str, relative: str, path_filter: PathFilter, extensions) -> Iterator[Dict[str, str]]:
+    """Yield header files under directory/relative in sorted relative-path order."""
+    for key, name in _entries(directory, relative, path_filter, extensions):
+        if key.endswith(os.sep):
+            yield from _walk(directory, relative + key, path_filter, extensions)
+        else:
+            yield _file_info(directory, relative + name, name)
+
+
+def _git_files(directory: str, path_filter: PathFilter, extensions) -> Optional[List[Dict[str, str]]]:
+    """Return header files from `git ls-files`, or None if git is unavailable."""
+    import subprocess
+    
+    try:
+        output = subprocess.run(
+            ['git', '-C', directory, 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    files = []
+    for path in output.decode('utf-8', errors='surrogateescape').split('\0'):
+        if not path or os.path.splitext(path)[1] not in extensions:
+            continue
+        if not path_filter.accepts(path):
+            continue
+        relative_path = path.replace('/', os.sep)
+        if not os.path.isfile(os.path.join(directory, relative_path)):
+            continue  # Deleted in the working tree
+        files.append(_file_info(directory, relative_path, path.rsplit('/', 1)[-1]))
+    # Same order as the directory walk
+    files.sort(key=lambda f: f['relative_path'])
+    return files
+
+
+def iter_header_files(directory: str,
+                      exclude_dirs: List[str] = None,
+                      exclude: List[str] = None,
+                      include: List[str] = None,
+                      extensions: Iterable[str] = None,
+                      workers: int = 1,
+                      use_git: bool = False) -> Iterator[Dict[str, str]]:
+    """
+    Lazily yield C++ header files in the given directory.
+    
+    Files are yielded sorted by relative path without holding the whole tree
+    in memory: each directory level is sorted on its own, with directories
+    ordered as if their names ended in a path separator. Excluded
+    directories are pruned without being listed.
     
     Args:
         directory: Root directory to scan
         exclude_dirs: List of directory names to exclude (e.g., ['build', '.git'])
+        exclude: Additional gitignore-style patterns to exclude (e.g., ['out-*/', '/third_party'])
+        include: gitignore-style patterns a file must match (e.g., ['src/**'])
+        extensions: Header file extensions (default: HEADER_EXTENSIONS)
+        workers: Threads walking top-level subdirectories in parallel
+        use_git: List files with `git ls-files` (tracked and untracked, not ignored)
+                 instead of walking the tree; falls back to walking outside a git repo
     
-    Returns:
-        List of dictionaries with 'path' and 'relative_path' for each header file
+    Yields:
+        Dictionaries with 'path', 'relative_path' and 'filename' for each header file
     """
     if exclude_dirs is None:
-        exclude_dirs = ['.git', 'build', 'cmake-build', 'node_modules', 
-                       'venv', '__pycache__', '.vscode', '.idea']
-    
-    header_files = []
-    directory_path = Path(directory)
+        exclude_dirs = DEFAULT_EXCLUDE_DIRS
+    extensions = set(extensions or HEADER_EXTENSIONS)
+    path_filter = PathFilter([d + '/' for d in exclude_dirs] + list(exclude or []), include or [])
     
-    if not directory_path.exists():
+    if not Path(directory).exists():
         raise ValueError(f"Directory does not exist: {directory}")
     
-    # Header file extensions
-    header_extensions = {'.h', '.hpp', '.hxx', '.hh'}
-    
-    for root, dirs, files in os.walk(directory):
-        # Skip excluded directories
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        
-        for file in files:
-            file_path = Path(root) / file
-            if file_path.suffix in header_extensions:
-                relative_path = file_path.relative_to(directory_path)
-                header_files.append({
-                    'path': str(file_path),
-                    'relative_path': str(relative_path),
-                    'filename': file
-                })
-    
-    return sorted(header_files, key=lambda x: x['relative_path'])
+    if use_git:
+        files = _git_files(directory, path_filter, extensions)
+        if files is not None:
+            yield from files
+            return
+        print(f"⚠️  git ls-files failed in {directory}, scanning the directory instead")
+    
+    if workers <= 1:
+        yield from _walk(directory, '', path_filter, extensions)
+        return
+    
+    # Walk each top-level subdirectory in its own thread; results are
+    # yielded in order as soon as the subtrees ahead of them are done.
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def subtree(relative):
+        return list(_walk(directory, relative, path_filter, extensions))
+    
+    top_level = _entries(directory, '', path_filter, extensions)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(subtree, key) if key.endswith(os.sep) else None
+                   for key, _ in top_level]
+        for (key, name), future in zip(top_level, futures):
+            if future is None:
+                yield _file_info(directory, name, name)
+            else:
+                yield from future.result()
+
+
+def find_header_files(directory: str, exclude_dirs: List[str] = None, **options) -> List[Dict[str, str]]:
+    """
+    Find all C++ header files in the given directory.
+    
+    Args:
+        directory: Root directory to scan
+        exclude_dirs: List of directory names to exclude (e.g., ['build', '.git'])
+        **options: exclude, include, extensions, workers and use_git as for
+                   iter_header_files
+    
+    Returns:
+        List of dictionaries with 'path' and 'relative_path' for each header file
+    """
+    return list(iter_header_files(directory, exclude_dirs, **options))
 
 
 def get_file_content(file_path: str) -> str:
@@ -0,0 +1,288 @@
+"""
+Include Dependency Graph
+Records which project headers include which, from a fast #include scan or
+from libclang, to find every header affected by a change and to order parse
+work so shared dependencies come first.
+"""
+
+import heapq
+import json
+import os
+import posixpath
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+# Bump when the graph format changes so stale graphs are rebuilt
+GRAPH_VERSION = 1
+
+# Unanchored: a MULTILINE '^' makes the scan several times slower, so
+# scan_includes checks for a line start itself
+INCLUDE_PATTERN = re.compile(r'#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]')
+
+
+def scan_includes(content: str) -> List[str]:
+    """Return a file's #include directives as spelled, e.g. '"uart.h"' or '<vector>'."""
+    includes = []
+    for match in INCLUDE_PATTERN.finditer(content):
+        start = match.start()
+        line_start = content.rfind('\n', 0, start) + 1
+        if content[line_start:start].strip(' \t'):
+            continue
+        quote, name = match.groups()
+        includes.append(f'{quote}{name.strip()}{">" if quote == "<" else quote}')
+    return includes
+
+
+def _common_dirs(a: str, b: str) -> int:
+    """Return the number of leading directories two paths share."""
+    count = 0
+    for x, y in zip(a.split('/')[:-1], b.split('/')[:-1]):
+        if x != y:
+            break
+        count += 1
+    return count
+
+
+def _names_path(include: str, path: str) -> bool:
+    """Return True if an unresolved include (spelled or a path) may name path."""
+    name = posixpath.normpath(include.strip('"<>').replace(os.sep, '/'))
+    return path == name or path.endswith('/' + name)
+
+
+class IncludeGraph:
+    """
+    Include edges between the headers of one project.
+
+    Files are identified by their path relative to the project root. Each
+    file's includes are given either as spelled in the source (from
+    scan_includes) or already resolved to project paths (e.g. from libclang).
+    link() resolves spelled includes to project files: quoted ones against
+    the including file's directory first, then against include_dirs, then
+    by a unique path suffix (the closest match wins when several headers
+    share a name). Includes of files outside the project are kept as
+    external names.
+    """
+
+    def __init__(self, include_dirs: List[str] = None):
+        self.include_dirs = [d.strip('/') for d in include_dirs or ['']]
+        self.files: List[str] = []
+        self.by_path: Dict[str, int] = {}
+        self.includes: List[List[int]] = []
+        self.included_by: List[List[int]] = []
+        self.external: List[List[str]] = []
+        self._pending: List[tuple] = []   # (file id, includes, resolved) to link
+        self._linked = True
+
+    def add_file(self, path: str, includes: Iterable[str], resolved: bool = False):
+        """
+        Add one file and its includes.
+
+        Args:
+            path: File path relative to the project root
+            includes: Spelled includes, or project-relative paths if resolved
+            resolved: True if includes are already resolved paths
+        """
+        path = path.replace(os.sep, '/')
+        file_id = self.by_path.get(path)
+        if file_id is None:
+            file_id = len(self.files)
+            self.by_path[path] = file_id
+            self.files.append(path)
+            self.includes.append([])
+            self.external.append([])
+        self._pending.append((file_id, list(includes), resolved))
+        self._linked = False
+
+    def link(self):
+        """Resolve pending includes and build the reverse (included-by) edges."""
+        by_name: Dict[str, List[int]] = {}
+        for file_id, path in enumerate(self.files):
+            by_name.setdefault(posixpath.basename(path), []).append(file_id)
+
+        for file_id, includes, resolved in self._pending:
+            edges = []
+            external = []
+            for include in includes:
+                if resolved:
+                    target = self.by_path.get(include.replace(os.sep, '/'))
+                else:
+                    target = self._resolve(file_id, include, by_name)
+                if target is None or target == file_id:
+                    external.append(include)
+                elif target not in edges:
+                    edges.append(target)
+            self.includes[file_id] = edges
+            self.external[file_id] = external
+        self._pending = []
+        self._build_reverse()
+
+    def _resolve(self, file_id: int, include: str, by_name: Dict[str, List[int]]) -> Optional[int]:
+        """Resolve one spelled include to a project file id, or None."""
+        quoted = include.startswith('"')
+        name = include.strip('"<>')
+        path = self.files[file_id]
+        candidates = []
+        if quoted:
+            candidates.append(posixpath.join(posixpath.dirname(path), name))
+        candidates.extend(posixpath.join(d, name) if d else name for d in self.include_dirs)
+        for candidate in candidates:
+            target = self.by_path.get(posixpath.normpath(candidate))
+            if target is not None:
+                return target
+
+        # Fall back to any project file whose path ends with the include
+        name = posixpath.normpath(name)
+        matches = [i for i in by_name.get(posixpath.basename(name), [])
+                   if self.files[i] == name or self.files[i].endswith('/' + name)]
+        if not matches:
+            return None
+        return max(matches, key=lambda i: (_common_dirs(path, self.files[i]), -i))
+
+    def _build_reverse(self):
+        self.included_by = [[] for _ in self.files]
+        for file_id, targets in enumerate(self.includes):
+            for target in targets:
+                self.included_by[target].append(file_id)
+        self._linked = True
+
+    def _ensure_linked(self):
+        if not self._linked:
+            self.link()
+
+    @property
+    def edge_count(self) -> int:
+        self._ensure_linked()
+        return sum(len(targets) for targets in self.includes)
+
+    def affected(self, changed: Iterable[str]) -> List[str]:
+        """
+        Return the changed files plus every file that includes one of them,
+        directly or indirectly, in the order the files were added.
+
+        Changed paths that are not in the graph (e.g. deleted headers) are
+        returned as is, and the files still including them count as changed.
+        """
+        self._ensure_linked()
+        seen = set()
+        unknown = []
+        queue = deque()
+        for path in changed:
+            path = path.replace(os.sep, '/')
+            file_id = self.by_path.get(path)
+            if file_id is None:
+                unknown.append(path)
+            elif file_id not in seen:
+                seen.add(file_id)
+                queue.append(file_id)
+        if unknown:
+            for file_id, external in enumerate(self.external):
+                if file_id not in seen and any(_names_path(include, path)
+                                               for include in external for path in unknown):
+                    seen.add(file_id)
+                    queue.append(file_id)
+        while queue:
+            for includer in self.included_by[queue.popleft()]:
+                if includer not in seen:
+                    seen.add(includer)
+                    queue.append(includer)
+        return [self.files[i] for i in sorted(seen)] + unknown
+
+    def topological_order(self, paths: Iterable[str] = None) -> List[str]:
+        """
+        Order files so that each comes after the files it includes.
+
+        Only the given paths (default: every file) are ordered; include
+        cycles are broken at the earliest-added file. Files not in the graph
+        go last, in their given order.
+        """
+        self._ensure_linked()
+        paths = list(self.files if paths is None else paths)
+        selected = {}
+        unknown = []
+        for path in paths:
+            file_id = self.by_path.get(path.replace(os.sep, '/'))
+            if file_id is None:
+                unknown.append(path)
+            else:
+                selected.setdefault(file_id, path)
+
+        # Kahn's algorithm on the selected files, earliest-added first
+        pending = {i: sum(1 for t in self.includes[i] if t in selected) for i in selected}
+        ready = [i for i, count in pending.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while pending:
+            if not ready:
+                # Include cycle: release the earliest remaining file
+                ready = [min(pending)]
+            file_id = heapq.heappop(ready)
+            if file_id not in pending:
+                continue
+            del pending[file_id]
+            order.append(selected[file_id])
+            for includer in self.included_by[file_id]:
+                if includer in pending:
+                    pending[includer] -= 1
+                    if pending[includer] == 0:
+                        heapq.heappush(ready, includer)
+        return order + unknown
+
+    def save(self, path: str):
+        """Write the linked graph to disk atomically."""
+        self._ensure_linked()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': GRAPH_VERSION,
+                'files': self.files,
+                'includes': self.includes,
+                'external': self.external,
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'IncludeGraph':
+        """Load a saved graph; the reverse edges are rebuilt on load."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != GRAPH_VERSION:
+            raise ValueError(f"Include graph {path} has version {data.get('version')}, "
+                             f"expected {GRAPH_VERSION}; re-run the analyzer to rebuild it")
+        graph = cls()
+        graph.files = data['files']
+        graph.by_path = {p: i for i, p in enumerate(graph.files)}
+        graph.includes = data['includes']
+        graph.external = data['external']
+        graph._build_reverse()
+        return graph
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Query an include graph written with --include-graph")
+    parser.add_argument("graph", help="Include graph (.json) to read")
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--affected", nargs="+", metavar="PATH",
+                       help="List the headers affected by changes to these paths "
+                            "(relative to the project root; '-' reads them from stdin, "
+                            "e.g. git diff --name-only | ... --affected -)")
+    query.add_argument("--order", action="store_true",
+                       help="List every header with its dependencies first")
+    args = parser.parse_args()
+
+    graph = IncludeGraph.load(args.graph)
+    if args.order:
+        for path in graph.topological_order():
+            print(path)
+    else:
+        changed = args.affected
+        if changed == ['-']:
+            changed = [line.strip() for line in sys.stdin if line.strip()]
+        for path in graph.affected(changed):
+            print(path)
@@ -3,41 +3,60 @@ LLM Agent for Interface Analysis
 Uses LangChain to analyze C++ interfaces with local or cloud LLM.
 """
 
+import importlib.util
+import json
 import os
+import re
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Try to import LangChain components
-try:
-    from langchain.llms import Ollama
-    from langchain_openai import ChatOpenAI
-    from langchain_ollama import ChatOllama
-    from langchain.prompts import ChatPromptTemplate
-    from langchain.schema import HumanMessage, SystemMessage
-    LANGCHAIN_AVAILABLE = True
-except ImportError:
-    LANGCHAIN_AVAILABLE = False
-    print("Warning: LangChain not installed. Install with: pip install langchain langchain-ollama langchain-openai")
+# LangChain and the provider SDKs take seconds to import, so they are only
+# imported by create_llm, i.e. when the LLM stage actually runs.
+LANGCHAIN_INSTALL_HINT = "pip install langchain langchain-ollama langchain-openai"
+PROVIDER_PACKAGES = {True: 'langchain_ollama', False: 'langchain_openai'}
 
 
-def create_llm(local: bool = True, model: str = None):
+def langchain_available(local: bool = True) -> bool:
+    """Check whether the LangChain integration for a provider is installed, without importing it."""
+    return importlib.util.find_spec(PROVIDER_PACKAGES[local]) is not None
+
+
+# Default per-request timeout in seconds (local models can be slow)
+DEFAULT_TIMEOUT = 120.0
+
+
+def create_llm(local: bool = True, model: str = None,
+               timeout: float = None, max_connections: int = None):
     """
     Create an LLM instance (local or cloud).
     
     Args:
         local: If True, use Ollama (local). If False, use OpenAI.
         model: Model name (e.g., 'llama3.2' for Ollama, 'gpt-4' for OpenAI)
+        timeout: Per-request timeout in seconds (None for the client default)
+        max_connections: Size of the keep-alive HTTP connection pool
+                         (None for the client default)
     
     Returns:
         LLM instance
     """
-    if not LANGCHAIN_AVAILABLE:
-        raise ImportError("LangChain is required. Install with: pip install langchain langchain-ollama langchain-openai")
+    if not langchain_available(local):
+        raise ImportError(f"LangChain is required. Install with: {LANGCHAIN_INSTALL_HINT}")
+    
+    client_options = {}
+    if timeout is not None:
+        client_options['timeout'] = timeout
+    if max_connections:
+        import httpx
+        client_options['limits'] = httpx.Limits(max_connections=max_connections,
+                                                max_keepalive_connections=max_connections)
     
     if local:
         # Use Ollama (local)
+        from langchain_ollama import ChatOllama
+        
         model_name = model or os.getenv("OLLAMA_MODEL", "llama3.2")
         base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
         
@@ -45,7 +64,8 @@ def create_llm(local: bool = True, model: str = None):
             return ChatOllama(
                 model=model_name,
                 base_url=base_url,
-                temperature=0.1
+                temperature=0.1,
+                **({'client_kwargs': client_options} if client_options else {})
             )
         except Exception as e:
             print(f"Error connecting to Ollama: {e}")
@@ -53,39 +73,113 @@ def create_llm(local: bool = True, model: str = None):
             raise
     else:
         # Use OpenAI (cloud)
+        from langchain_openai import ChatOpenAI
+        
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         
         model_name = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        extra = {}
+        if client_options:
+            import httpx
+            extra['http_client'] = httpx.Client(**client_options)
+            extra['timeout'] = timeout
         return ChatOpenAI(
             model=model_name,
             api_key=api_key,
-            temperature=0.1
+            temperature=0.1,
+            **extra
         )
 
 
-def enhance_interface_description(interface: Dict, file_content: str, llm) -> str:
+class LLMSession:
     """
-    Use LLM to enhance the description of an interface.
+    One LLM client shared by every request of a run.
+    
+    The underlying HTTP client keeps a pool of keep-alive connections, so
+    requests after the first skip connection setup and TLS handshakes.
+    Safe to share between the enhancement worker threads. Close it (or use
+    it as a context manager) to release the connections.
+    """
+    
+    def __init__(self, local: bool = True, model: str = None,
+                 timeout: float = DEFAULT_TIMEOUT, max_connections: int = 4):
+        self.local = local
+        self.provider = 'ollama' if local else 'openai'
+        self.timeout = timeout
+        self.llm = create_llm(local=local, model=model, timeout=timeout,
+                              max_connections=max_connections)
+        self.model, self.temperature = llm_identity(self.llm)
+    
+    def invoke(self, prompt: str) -> str:
+        """Send one prompt and return the response text."""
+        return response_text(self.llm.invoke(prompt))
+    
+    def close(self):
+        """Close the pooled HTTP connections."""
+        # ChatOpenAI: .client._client is the OpenAI client owning the httpx
+        # pool; ChatOllama: ._client is an ollama.Client wrapping httpx
+        # in its own ._client
+        for owner in (getattr(self.llm, 'client', None), getattr(self.llm, '_client', None)):
+            http_client = getattr(owner, '_client', None)
+            if http_client is not None and hasattr(http_client, 'close'):
+                try:
+                    http_client.close()
+                except Exception:
+                    pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def llm_identity(llm) -> tuple:
+    """Return (model name, temperature) for an LLM instance."""
+    model = getattr(llm, 'model', None) or getattr(llm, 'model_name', None) or type(llm).__name__
+    temperature = getattr(llm, 'temperature', None)
+    return str(model), float(temperature) if temperature is not None else 0.0
+
+
+# Characters of surrounding source included on each side of an interface
+CONTEXT_CHARS = 200
+
+# Rough characters-per-token ratio used for prompt budgeting
+CHARS_PER_TOKEN = 4
+
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a prompt."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def context_span(interface: Dict, file_content: str) -> tuple:
+    """Return the (start, end) of the source shown to the LLM for an interface."""
+    start = interface.get('start_pos', 0)
+    end = interface.get('end_pos', len(file_content))
+    return max(0, start - CONTEXT_CHARS), min(len(file_content), end + CONTEXT_CHARS)
+
+
+def build_interface_prompt(interface: Dict, file_content: str) -> str:
+    """
+    Build the LLM prompt used to describe a single interface.
     
     Args:
         interface: Dictionary with interface information
         file_content: Full content of the header file
-        llm: LLM instance
     
     Returns:
-        Enhanced description
+        Prompt text
     """
-    if not LANGCHAIN_AVAILABLE:
-        return interface.get('description', 'No description available')
-    
     # Extract context around the interface
-    start = interface.get('start_pos', 0)
-    end = interface.get('end_pos', len(file_content))
-    context = file_content[max(0, start - 200):min(len(file_content), end + 200)]
+    start, end = context_span(interface, file_content)
+    context = file_content[start:end]
     
-    prompt = f"""Analyze this C++ interface and provide a brief, clear description (1-2 sentences).
+    return f"""Analyze this C++ interface and provide a brief, clear description (1-2 sentences).
 
 Interface: {interface['type']} {interface['name']}
 Context:
@@ -97,17 +191,116 @@ Provide a concise description of what this interface does and its purpose.
 If it's a firmware/HAL interface, mention the hardware peripheral or functionality.
 Keep it brief (max 100 words)."""
 
+
+def build_batch_prompt(interfaces: List[Dict], file_content: str) -> str:
+    """
+    Build one LLM prompt describing several interfaces from the same file.
+    
+    Overlapping context around neighbouring interfaces is merged so that no
+    source text is sent twice.
+    
+    Args:
+        interfaces: Interfaces from one file, in file order
+        file_content: Full content of the header file
+    
+    Returns:
+        Prompt text asking for a JSON object keyed by interface number
+    """
+    spans = []
+    for start, end in sorted(context_span(i, file_content) for i in interfaces):
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = max(spans[-1][1], end)
+        else:
+            spans.append([start, end])
+    context = "\n// ...\n".join(file_content[start:end] for start, end in spans)
+    
+    listing = "\n".join(f"{n}. {interface['type']} {interface['name']}"
+                        for n, interface in enumerate(interfaces, 1))
+    
+    return f"""Analyze these C++ interfaces and provide a brief, clear description (1-2 sentences) of each.
+
+Interfaces:
+{listing}
+
+Context:
+```cpp
+{context}
+```
+
+For each interface, describe what it does and its purpose.
+If it's a firmware/HAL interface, mention the hardware peripheral or functionality.
+Keep each description brief (max 100 words).
+
+Respond with only a JSON object mapping each interface number to its description, e.g.
+{{"1": "description of the first interface", "2": "description of the second interface"}}"""
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, str]:
+    """
+    Parse the JSON answer to a batch prompt.
+    
+    Args:
+        text: Response text
+        count: Number of interfaces in the batch
+    
+    Returns:
+        Mapping of 0-based interface index to description; interfaces that
+        are missing or malformed in the response are left out
+    """
+    match = JSON_OBJECT_PATTERN.search(text)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group())
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    
+    descriptions = {}
+    for key, value in data.items():
+        try:
+            index = int(str(key).strip().rstrip('.')) - 1
+        except ValueError:
+            continue
+        if 0 <= index < count and isinstance(value, str) and value.strip():
+            descriptions[index] = value.strip()
+    return descriptions
+
+
+def response_text(response) -> str:
+    """Extract the text from an LLM response object."""
+    if hasattr(response, 'content'):
+        return response.content.strip()
+    return str(response).strip()
+
+
+def enhance_interface_description(interface: Dict, file_content: str, llm) -> str:
+    """
+    Use LLM to enhance the description of an interface.
+    
+    Args:
+        interface: Dictionary with interface information
+        file_content: Full content of the header file
+        llm: LLM instance
+    
+    Returns:
+        Enhanced description
+    """
+    if llm is None:
+        return interface.get('description', 'No description available')
+    
+    prompt = build_interface_prompt(interface, file_content)
+
     try:
-        response = llm.invoke(prompt)
-        if hasattr(response, 'content'):
-            return response.content.strip()
-        return str(response).strip()
+        return response_text(llm.invoke(prompt))
     except Exception as e:
         print(f"Error enhancing description: {e}")
         return interface.get('description', 'No description available')
 
 
-def analyze_interfaces(parsed_data: Dict, file_content: str, use_local: bool = True) -> Dict:
+def analyze_interfaces(parsed_data: Dict, file_content: str, use_local: bool = True,
+                       session: Optional[LLMSession] = None) -> Dict:
     """
     Analyze interfaces using LLM to enhance descriptions.
     
@@ -115,27 +308,35 @@ def analyze_interfaces(parsed_data: Dict, file_content: str, use_local: bool = T
         parsed_data: Parsed interface data from basic_parser
         file_content: Full content of the header file
         use_local: Whether to use local LLM (Ollama) or cloud (OpenAI)
+        session: Shared LLM session; pass one when analyzing many files so
+                 the client and its connections are reused
     
     Returns:
         Enhanced parsed data with improved descriptions
     """
-    if not LANGCHAIN_AVAILABLE:
-        print("LangChain not available, using basic descriptions only")
+    if session is None and not langchain_available(use_local):
+        print(f"LangChain not available, using basic descriptions only. Install with: {LANGCHAIN_INSTALL_HINT}")
         return parsed_data
     
-    try:
-        llm = create_llm(local=use_local)
-    except Exception as e:
-        print(f"Could not create LLM: {e}")
-        print("Using basic descriptions only")
-        return parsed_data
+    own_session = session is None
+    if own_session:
+        try:
+            session = LLMSession(local=use_local)
+        except Exception as e:
+            print(f"Could not create LLM: {e}")
+            print("Using basic descriptions only")
+            return parsed_data
     
-    # Enhance descriptions for each interface
-    enhanced_interfaces = []
-    for interface in parsed_data['interfaces']:
-        enhanced_desc = enhance_interface_description(interface, file_content, llm)
-        interface['description'] = enhanced_desc or interface.get('description', 'No description')
-        enhanced_interfaces.append(interface)
+    try:
+        # Enhance descriptions for each interface
+        enhanced_interfaces = []
+        for interface in parsed_data['interfaces']:
+            enhanced_desc = enhance_interface_description(interface, file_content, session.llm)
+            interface['description'] = enhanced_desc or interface.get('description', 'No description')
+            enhanced_interfaces.append(interface)
+    finally:
+        if own_session:
+            session.close()
     
     parsed_data['interfaces'] = enhanced_interfaces
     return parsed_data
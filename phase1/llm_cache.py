@@ -0,0 +1,132 @@
+"""
+Persistent LLM Response Cache
+Stores LLM descriptions in SQLite, keyed on a hash of the prompt, model name
+and temperature, so unchanged interfaces are never sent to the model twice.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cpp-interface-analyzer")
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 90
+
+
+def cache_key(prompt: str, model: str, temperature: float) -> str:
+    """Return the content-addressed key for a prompt/model/temperature triple."""
+    digest = hashlib.sha256()
+    digest.update(f"{model}\0{temperature}\0".encode('utf-8'))
+    digest.update(prompt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of LLM responses.
+
+    Safe to share between the enhancement worker threads. Entries older than
+    max_age_days are dropped when the cache is opened; on close the least
+    recently used entries are evicted until the cache fits within
+    max_entries and max_bytes.
+    """
+
+    def __init__(self, cache_dir: str = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS):
+        self.cache_dir = os.path.expanduser(cache_dir or os.getenv("LLM_CACHE_DIR", DEFAULT_CACHE_DIR))
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.path = os.path.join(self.cache_dir, "llm_cache.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " temperature REAL NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+        self._expire()
+
+    def get(self, prompt: str, model: str, temperature: float) -> Optional[str]:
+        """Return the cached response for a prompt, or None."""
+        key = cache_key(prompt, model, temperature)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key)
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, prompt: str, model: str, temperature: float, response: str):
+        """Store a response for a prompt."""
+        key = cache_key(prompt, model, temperature)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, model, temperature, response, len(response.encode('utf-8')), now, now)
+            )
+            self._conn.commit()
+
+    def _expire(self):
+        """Drop entries older than max_age_days."""
+        if not self.max_age_days:
+            return
+        cutoff = time.time() - self.max_age_days * 86400
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+            self._conn.commit()
+
+    def evict(self):
+        """Evict least recently used entries until within the size limits."""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            if count <= self.max_entries and total <= self.max_bytes:
+                return
+            removed = 0
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed"
+            ).fetchall()
+            stale = []
+            for key, size in rows:
+                if count - removed <= self.max_entries and total <= self.max_bytes:
+                    break
+                stale.append((key,))
+                removed += 1
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+            self._conn.commit()
+
+    def close(self):
+        """Apply eviction and close the database."""
+        self.evict()
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
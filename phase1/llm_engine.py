@@ -0,0 +1,296 @@
+"""
+Concurrent LLM Enhancement Engine
+Dispatches interface prompts to the LLM in parallel with a bounded number of
+in-flight requests, per-provider rate limiting and retry with backoff, while
+streaming files through in their original order.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from llm_agent import (langchain_available, LANGCHAIN_INSTALL_HINT, LLMSession, DEFAULT_TIMEOUT,
+                       build_interface_prompt, build_batch_prompt, parse_batch_response, estimate_tokens)
+from llm_cache import LLMCache
+
+
+# Default request rate per provider in requests/second (0 = unlimited).
+# Override with OLLAMA_RATE_LIMIT / OPENAI_RATE_LIMIT or --llm-rate-limit.
+DEFAULT_RATE_LIMITS = {
+    'ollama': 0.0,
+    'openai': 5.0,
+}
+
+# Default estimated prompt tokens per batched request (--llm-batch)
+DEFAULT_BATCH_TOKENS = 3000
+# Upper bound on interfaces per batch, keeping the JSON answer short
+MAX_BATCH_INTERFACES = 20
+# Cache model tag for descriptions that came from batched prompts
+BATCH_CACHE_SUFFIX = '+batch'
+
+
+def provider_rate_limit(provider: str) -> float:
+    """Return the configured request rate for a provider."""
+    env_value = os.getenv(f"{provider.upper()}_RATE_LIMIT")
+    if env_value:
+        try:
+            return float(env_value)
+        except ValueError:
+            print(f"Warning: invalid {provider.upper()}_RATE_LIMIT '{env_value}', using default")
+    return DEFAULT_RATE_LIMITS.get(provider, 0.0)
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing requests at least 1/rate seconds apart."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Block until the caller may send the next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def invoke_with_retry(session: LLMSession, prompt: str, limiter: RateLimiter,
+                      retries: int = 3, backoff: float = 1.0) -> str:
+    """
+    Invoke the LLM, retrying failed requests with exponential backoff.
+
+    Args:
+        session: Shared LLM session
+        prompt: Prompt text
+        limiter: Rate limiter shared by all workers
+        retries: Number of retries after the first attempt
+        backoff: Base delay in seconds (doubled on each retry, plus jitter)
+
+    Returns:
+        Response text
+
+    Raises:
+        The last exception if every attempt fails
+    """
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            return session.invoke(prompt)
+        except Exception:
+            if attempt >= retries:
+                raise
+            time.sleep(backoff * (2 ** attempt) + random.uniform(0, backoff))
+            attempt += 1
+
+
+def open_llm_session(use_local: bool = True, timeout: float = DEFAULT_TIMEOUT,
+                     max_connections: int = 4) -> Optional[LLMSession]:
+    """
+    Create the LLM session for a run.
+
+    Returns:
+        The session, or None (after printing why) if no LLM can be used
+    """
+    if not langchain_available(use_local):
+        print("   LangChain not available, using basic descriptions only")
+        print(f"   Install with: {LANGCHAIN_INSTALL_HINT}")
+        return None
+    try:
+        return LLMSession(local=use_local, timeout=timeout, max_connections=max_connections)
+    except Exception as e:
+        print(f"   Could not create LLM: {e}")
+        print("   Using basic descriptions only")
+        return None
+
+
+def plan_batches(interfaces: List[Dict], content: str, token_budget: int,
+                 max_interfaces: int = MAX_BATCH_INTERFACES) -> List[List[Dict]]:
+    """
+    Group a file's interfaces into batches whose prompt fits a token budget.
+
+    Args:
+        interfaces: Interfaces from one file, in file order
+        content: File content
+        token_budget: Maximum estimated prompt tokens per batch
+        max_interfaces: Maximum interfaces per batch
+
+    Returns:
+        Consecutive groups of interfaces; an interface too large for the
+        budget on its own forms a batch of one
+    """
+    batches = []
+    current = []
+    for interface in interfaces:
+        candidate = current + [interface]
+        if current and (len(candidate) > max_interfaces or
+                        estimate_tokens(build_batch_prompt(candidate, content)) > token_budget):
+            batches.append(current)
+            current = [interface]
+        else:
+            current = candidate
+    if current:
+        batches.append(current)
+    return batches
+
+
+def enhance_stream(items: Iterable[Tuple],
+                   session: Optional[LLMSession],
+                   concurrency: int = 4,
+                   rate_limit: Optional[float] = None,
+                   retries: int = 3,
+                   cache: Optional[LLMCache] = None,
+                   batch_tokens: int = 0,
+                   select: Optional[Callable[[Dict, Dict], bool]] = None) -> Iterator[Tuple]:
+    """
+    Enhance interface descriptions for a stream of files concurrently.
+
+    Files are consumed lazily and yielded back in input order as soon as all
+    of their interfaces are described. Only a few files per worker are held
+    at once, so memory stays bounded for any number of files.
+
+    Args:
+        items: Tuples whose first two fields are parsed data and file content;
+               any further fields are passed through untouched. Files with
+               empty content are passed through without enhancement.
+        session: LLM session shared by all requests (None to keep the basic
+                 descriptions)
+        concurrency: Maximum number of in-flight LLM requests
+        rate_limit: Requests/second (None for the provider default)
+        retries: Retries per interface before keeping the basic description
+        cache: Optional response cache; hits skip the LLM entirely
+        batch_tokens: If set, describe several interfaces of a file in one
+                      JSON prompt of up to this many estimated tokens;
+                      interfaces missing from the answer are retried alone
+        select: Optional policy called as select(interface, parsed_data);
+                interfaces it rejects keep their parsed description and
+                never reach the cache or the LLM (see llm_policy.LLMPolicy)
+
+    Yields:
+        The input tuples with improved descriptions, in the original order
+    """
+    if session is None:
+        yield from items
+        return
+
+    if rate_limit is None:
+        rate_limit = provider_rate_limit(session.provider)
+    limiter = RateLimiter(rate_limit)
+
+    model, temperature = session.model, session.temperature
+    # Batched answers are cached per interface, apart from single-prompt answers
+    cache_model = model + BATCH_CACHE_SUFFIX if batch_tokens else model
+    max_in_flight = max(1, concurrency) * 4
+
+    stats = {'requests': 0, 'prompt_tokens': 0, 'batched': 0, 'fallbacks': 0}
+    stats_lock = threading.Lock()
+
+    def call(prompt):
+        with stats_lock:
+            stats['requests'] += 1
+            stats['prompt_tokens'] += estimate_tokens(prompt)
+        return invoke_with_retry(session, prompt, limiter, retries)
+
+    def describe(interface, content):
+        prompt = build_interface_prompt(interface, content)
+        response = call(prompt)
+        if cache and response:
+            cache.put(prompt, cache_model, temperature, response)
+        return response
+
+    def run(interfaces, content):
+        if len(interfaces) == 1:
+            return [describe(interfaces[0], content)]
+
+        try:
+            answers = parse_batch_response(call(build_batch_prompt(interfaces, content)), len(interfaces))
+        except Exception as e:
+            print(f"      ⚠️  Batch LLM error: {e}, describing interfaces one by one")
+            answers = {}
+
+        descriptions = []
+        for index, interface in enumerate(interfaces):
+            description = answers.get(index)
+            if description is None:
+                with stats_lock:
+                    stats['fallbacks'] += 1
+                try:
+                    description = describe(interface, content)
+                except Exception as e:
+                    print(f"      ⚠️  LLM error: {e}, using basic description")
+            elif cache:
+                cache.put(build_interface_prompt(interface, content), cache_model, temperature, description)
+            descriptions.append(description)
+        with stats_lock:
+            stats['batched'] += len(interfaces)
+        return descriptions
+
+    def finish(entry):
+        nonlocal done
+        item, jobs = entry
+        for interfaces, future in jobs:
+            try:
+                descriptions = future.result()
+            except Exception as e:
+                print(f"      ⚠️  LLM error: {e}, using basic description")
+                descriptions = [None] * len(interfaces)
+            for interface, enhanced_desc in zip(interfaces, descriptions):
+                done += 1
+                print(f"   [{done}] {item[0]['file_path']}: {interface['name']}")
+                interface['description'] = enhanced_desc or interface.get('description', 'No description')
+        return item
+
+    # Results are written back into each interface dict, and files leave the
+    # window in input order regardless of completion order.
+    pending = deque()
+    in_flight = 0
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for item in items:
+            parsed_data, content = item[0], item[1]
+            jobs = []
+            if content:
+                misses = []
+                for interface in parsed_data['interfaces']:
+                    if select and not select(interface, parsed_data):
+                        continue
+                    prompt = build_interface_prompt(interface, content)
+                    cached = cache.get(prompt, cache_model, temperature) if cache else None
+                    if cached:
+                        interface['description'] = cached
+                    else:
+                        misses.append(interface)
+                if batch_tokens:
+                    batches = plan_batches(misses, content, batch_tokens)
+                else:
+                    batches = [[interface] for interface in misses]
+                jobs = [(batch, executor.submit(run, batch, content)) for batch in batches]
+            pending.append((item, jobs))
+            in_flight += len(jobs)
+
+            while pending and (not pending[0][1] or in_flight > max_in_flight
+                               or all(f.done() for _, f in pending[0][1])):
+                entry = pending.popleft()
+                in_flight -= len(entry[1])
+                yield finish(entry)
+
+        while pending:
+            yield finish(pending.popleft())
+
+    if cache:
+        print(f"   LLM cache: {cache.hits} hits, {cache.misses} misses")
+    summary = f"   LLM requests: {stats['requests']}, ~{stats['prompt_tokens']} prompt tokens"
+    if batch_tokens:
+        summary += f" ({stats['batched']} interfaces batched, {stats['fallbacks']} retried alone)"
+    print(summary)
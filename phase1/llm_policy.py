@@ -0,0 +1,78 @@
+"""
+LLM Selection Policy
+Decides per interface whether an LLM description is worth a model call, so
+documented interfaces and trivial data structs keep their parsed description.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from file_scanner import PathFilter
+
+
+# An existing description with at least this many words is kept as is
+DEFAULT_MIN_DOC_WORDS = 5
+
+SKIP_REASONS = {
+    'path': 'skipped path',
+    'documented': 'already documented',
+    'plain_data': 'plain data struct',
+    'few_methods': 'too few public methods',
+}
+
+
+class LLMPolicy:
+    """
+    Selection policy applied to every interface before it is sent to the LLM.
+
+    An interface is skipped when its file matches a skip pattern, when the
+    parser already found a description of at least min_doc_words words, when
+    it is a plain data struct (no methods, no bases, e.g. a register block),
+    or when it has fewer than min_methods public methods. Counts per reason
+    are kept for the end-of-run report.
+    """
+
+    def __init__(self, min_doc_words: int = DEFAULT_MIN_DOC_WORDS,
+                 skip_plain_data: bool = True,
+                 min_methods: int = 0,
+                 skip_paths: List[str] = None):
+        self.min_doc_words = min_doc_words
+        self.skip_plain_data = skip_plain_data
+        self.min_methods = min_methods
+        self.path_filter = PathFilter(skip_paths) if skip_paths else None
+        self.selected = 0
+        self.skipped = {reason: 0 for reason in SKIP_REASONS}
+
+    def skip_reason(self, interface: Dict, file_path: str) -> Optional[str]:
+        """Return why an interface should not go to the LLM, or None to send it."""
+        if self.path_filter and not self.path_filter.accepts(file_path.replace(os.sep, '/')):
+            return 'path'
+        description = interface.get('description') or ''
+        if self.min_doc_words and len(description.split()) >= self.min_doc_words:
+            return 'documented'
+        if (self.skip_plain_data and interface.get('type') == 'struct'
+                and not interface.get('methods') and not interface.get('bases')):
+            return 'plain_data'
+        if interface.get('public_method_count', 0) < self.min_methods:
+            return 'few_methods'
+        return None
+
+    def needs_llm(self, interface: Dict, parsed_data: Dict) -> bool:
+        """Apply the policy to one interface, recording the decision."""
+        reason = self.skip_reason(interface, parsed_data.get('file_path', ''))
+        if reason is None:
+            self.selected += 1
+            return True
+        self.skipped[reason] += 1
+        if reason == 'plain_data' and not interface.get('description'):
+            interface['description'] = 'Plain data structure'
+        return False
+
+    def report(self) -> str:
+        """Summarize how many LLM calls the policy avoided."""
+        avoided = sum(self.skipped.values())
+        total = avoided + self.selected
+        details = ', '.join(f"{SKIP_REASONS[reason]}: {count}"
+                            for reason, count in self.skipped.items() if count)
+        summary = f"LLM calls avoided: {avoided} of {total} interfaces"
+        return f"{summary} ({details})" if details else summary
@@ -0,0 +1,148 @@
+"""
+File Manifest for Incremental Analysis
+Persists each header's mtime, size and content hash alongside its analysis
+result (and includes) so that re-runs only re-parse files that changed.
+"""
+
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional
+
+from records import to_plain
+
+
+# Bump when the stored result format changes so stale manifests are discarded
+MANIFEST_VERSION = 5
+
+
+def content_hash(content: str) -> str:
+    """Return the hash used to detect content changes."""
+    return hashlib.sha256(content.encode('utf-8', errors='ignore')).hexdigest()
+
+
+class FileManifest:
+    """
+    On-disk manifest mapping relative file paths to their stat, hash and result.
+
+    A file is considered unchanged when its mtime and size match the manifest,
+    or, failing that, when its content hash still matches (e.g. after a fresh
+    checkout touched every mtime).
+
+    Results are stored as plain JSON; load, if given, turns a stored result
+    back into records when it is looked up. Phase1 stores the parse from
+    before LLM enhancement, so a reused file is still enhanced under the
+    current LLM settings.
+    """
+
+    def __init__(self, path: str, schema: str, load: Callable = None):
+        self.path = path
+        self.schema = schema
+        self.load = load
+        self.entries: Dict[str, Dict] = {}
+        self._hashes: Dict[str, str] = {}  # Full path -> hash computed by a lookup
+        self.reused = 0
+        self.updated = 0
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION and data.get('schema') == schema:
+                    self.entries = data.get('files', {})
+                else:
+                    print(f"Manifest {path} is from a different version, rebuilding")
+            except (OSError, ValueError) as e:
+                print(f"Could not load manifest {path}: {e}, rebuilding")
+
+    def lookup(self, relative_path: str, full_path: str) -> Optional[Dict]:
+        """Return the stored result if the file is unchanged, else None."""
+        entry = self.entries.get(relative_path)
+        if entry is None or not self._unchanged(entry, full_path):
+            return None
+        return self._reuse(entry)
+
+    def changed(self, relative_path: str, full_path: str) -> bool:
+        """Return True if the file is new or changed since it was recorded."""
+        entry = self.entries.get(relative_path)
+        return entry is None or not self._unchanged(entry, full_path)
+
+    def includes(self, relative_path: str) -> Optional[List[str]]:
+        """Return the includes recorded for a file, or None if none were recorded."""
+        entry = self.entries.get(relative_path)
+        return entry.get('includes') if entry else None
+
+    def _unchanged(self, entry: Dict, full_path: str) -> bool:
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return False
+
+        if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return True
+
+        try:
+            with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
+                digest = content_hash(f.read())
+        except OSError:
+            return False
+
+        self._hashes[full_path] = digest
+        if digest != entry['hash']:
+            return False
+
+        entry['mtime_ns'] = stat.st_mtime_ns
+        entry['size'] = stat.st_size
+        return True
+
+    def known_hash(self, full_path: str) -> Optional[str]:
+        """Return the content hash computed while checking a file, if it was read."""
+        return self._hashes.get(full_path)
+
+    def _reuse(self, entry: Dict):
+        self.reused += 1
+        return self.load(entry['result']) if self.load else entry['result']
+
+    def update(self, relative_path: str, full_path: str, content: Optional[str], result,
+               includes: List[str] = None, digest: str = None):
+        """
+        Record the result (and optionally the includes) for a freshly analyzed file.
+
+        digest, if given, is the content_hash() of the file and content may be None.
+        """
+        stat = os.stat(full_path)
+        entry = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'hash': digest or content_hash(content),
+            'result': to_plain(result),
+        }
+        if includes is not None:
+            entry['includes'] = includes
+        self.entries[relative_path] = entry
+        self.updated += 1
+
+    def stale(self, current_paths: Iterable[str]) -> List[str]:
+        """Return the recorded paths that are not among current_paths (e.g. deleted files)."""
+        current = set(current_paths)
+        return [path for path in self.entries if path not in current]
+
+    def prune(self, current_paths: Iterable[str]) -> int:
+        """Drop entries for files that no longer exist. Returns the number removed."""
+        stale = self.stale(current_paths)
+        for path in stale:
+            del self.entries[path]
+        return len(stale)
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'schema': self.schema,
+                'files': self.entries,
+            }, f)
+        os.replace(tmp_path, self.path)
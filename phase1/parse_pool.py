@@ -0,0 +1,140 @@
+"""
+Parallel Header Parsing
+Fans file reading and parsing out over a process pool while keeping results
+in the order the files were given, with a bounded number of tasks in flight.
+"""
+
+import os
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from file_scanner import get_file_content
+import basic_parser
+
+BACKENDS = ('basic', 'tree-sitter')
+
+# Files per worker task when the number of files is not known up front
+STREAM_CHUNKSIZE = 16
+
+
+def get_parse_function(backend: str = 'basic'):
+    """Return the parse_header_file implementation for a parser backend."""
+    if backend == 'tree-sitter':
+        import ts_parser
+        return ts_parser.parse_header_file
+    return basic_parser.parse_header_file
+
+
+def parse_file(file_info: Dict[str, str], backend: str = 'basic') -> Tuple[Optional[Dict], Optional[str], str]:
+    """
+    Read and parse one header file.
+
+    Returns:
+        (parsed data or None if the file is empty, error message or None,
+         the content that was read, or "" if it is not needed downstream)
+    """
+    content = get_file_content(file_info['path'])
+    if not content:
+        return None, None, ""
+    try:
+        return get_parse_function(backend)(file_info['relative_path'], content), None, content
+    except Exception as e:
+        return None, str(e), ""
+
+
+def parse_batch(file_infos: List[Dict[str, str]], backend: str = 'basic') -> List[Tuple[Optional[Dict], Optional[str], str]]:
+    """Parse a chunk of files in one worker task."""
+    return [parse_file(file_info, backend) for file_info in file_infos]
+
+
+def default_chunksize(file_count: int, jobs: int) -> int:
+    """Pick a chunk size giving each worker a few chunks to balance load."""
+    return max(1, min(64, file_count // (jobs * 4) or 1))
+
+
+def parse_files(header_files: Iterable[Dict[str, str]],
+                jobs: int = 1,
+                chunksize: int = None,
+                backend: str = 'basic',
+                lookup: Callable[[Dict[str, str]], Optional[Dict]] = None
+                ) -> Iterator[Tuple[Dict[str, str], Optional[Dict], Optional[str], Optional[str]]]:
+    """
+    Parse header files, optionally across several processes.
+    
+    header_files may be a lazy iterator: it is consumed as results are
+    yielded, and at most a few chunks per worker are in flight at once, so
+    memory stays bounded however many files there are.
+
+    Args:
+        header_files: File info dicts from find_header_files/iter_header_files
+        jobs: Number of worker processes (1 parses in-process, 0 uses all cores)
+        chunksize: Files per submitted task (None to choose automatically)
+        backend: Parser backend, one of BACKENDS
+        lookup: Optional function returning a previous result for a file
+                (e.g. from a manifest); such files are not read or parsed
+
+    Yields:
+        (file_info, parsed data or None, error message or None, content), in
+        input order. Each file is read exactly once; the content is handed on
+        so later stages never go back to disk. content is None for files
+        served by lookup.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    if jobs <= 1:
+        for file_info in header_files:
+            previous = lookup(file_info) if lookup else None
+            if previous is not None:
+                yield file_info, previous, None, None
+            else:
+                yield (file_info, *parse_file(file_info, backend))
+        return
+
+    if chunksize is None:
+        if hasattr(header_files, '__len__'):
+            chunksize = default_chunksize(len(header_files), jobs)
+        else:
+            chunksize = STREAM_CHUNKSIZE
+    max_in_flight = jobs * 2
+
+    # Imported here: multiprocessing is slow to import and unused with -j 1
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Entries in input order: (file_infos, future, None) for a submitted
+    # chunk, or ([file_info], None, previous) for a file served by lookup
+    pending = deque()
+    in_flight = 0
+
+    def results(entry):
+        file_infos, future, previous = entry
+        if future is None:
+            return [(file_infos[0], previous, None, None)]
+        return [(file_info, *result) for file_info, result in zip(file_infos, future.result())]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        batch = []
+        for file_info in header_files:
+            previous = lookup(file_info) if lookup else None
+            if previous is None:
+                batch.append(file_info)
+                if len(batch) < chunksize:
+                    continue
+            # Submit the open chunk before queueing a reused file behind it
+            if batch:
+                pending.append((batch, executor.submit(parse_batch, batch, backend), None))
+                in_flight += 1
+                batch = []
+            if previous is not None:
+                pending.append(([file_info], None, previous))
+
+            while pending and (pending[0][1] is None or in_flight > max_in_flight):
+                entry = pending.popleft()
+                if entry[1] is not None:
+                    in_flight -= 1
+                yield from results(entry)
+
+        if batch:
+            pending.append((batch, executor.submit(parse_batch, batch, backend), None))
+        while pending:
+            yield from results(pending.popleft())
@@ -0,0 +1,198 @@
+"""
+Compact Analysis Records
+__slots__ record types for parsed files, interfaces and methods, shared by
+phase1 and phase2. They use a fraction of the memory of per-item dicts,
+intern repeated strings (names, namespaces, access levels), and still
+support dict-style access (record['name'], record.get('parent')) so every
+pipeline stage can treat them like the dicts they replace.
+"""
+
+import sys
+from typing import Dict, List, Optional
+
+_intern = sys.intern
+
+
+def _intern_optional(value: Optional[str]) -> Optional[str]:
+    return _intern(value) if value else value
+
+
+class Record:
+    """
+    Base class for slot records with dict-style access.
+
+    A field set to None counts as absent: it is left out of keys() and
+    to_dict(), `in` is False, and get() returns the default.
+    """
+
+    __slots__ = ()
+
+    # Read-only computed fields, readable like stored ones and included in to_dict()
+    COMPUTED = ()
+    # Read-only alternative names for stored fields
+    ALIASES = ()
+
+    def __getitem__(self, key: str):
+        if not isinstance(key, str) or not self._readable(key):
+            raise KeyError(key)
+        value = getattr(self, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self._readable(key) and getattr(self, key) is not None
+
+    def _readable(self, key: str) -> bool:
+        return key in self.__slots__ or key in self.COMPUTED or key in self.ALIASES
+
+    def get(self, key: str, default=None):
+        """Return a field, or default if it is absent."""
+        if not self._readable(key):
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def keys(self) -> List[str]:
+        """Return the names of the fields that are set."""
+        return [key for key in self.__slots__ if getattr(self, key) is not None]
+
+    def to_dict(self) -> Dict:
+        """Convert to plain dicts and lists (e.g. for JSON)."""
+        data = {key: to_plain(getattr(self, key)) for key in self.keys()}
+        for key in self.COMPUTED:
+            data[key] = getattr(self, key)
+        return data
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={getattr(self, key)!r}" for key in self.keys())
+        return f"{type(self).__name__}({fields})"
+
+    def __reduce__(self):
+        # Pickle as the constructor arguments: smaller than the default slot
+        # state, and strings are re-interned in the receiving process
+        return type(self), tuple(getattr(self, key) for key in self.__slots__)
+
+
+def to_plain(value):
+    """Convert records (and lists/tuples of them) to plain JSON-compatible values."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+class MethodRecord(Record):
+    """A member function. Phase1 fills name and access; phase2 adds the rest."""
+
+    __slots__ = ('name', 'access', 'signature', 'is_virtual', 'is_pure', 'is_static', 'is_const')
+
+    def __init__(self, name: str, access: str = 'public', signature: str = None,
+                 is_virtual: bool = None, is_pure: bool = None,
+                 is_static: bool = None, is_const: bool = None):
+        self.name = _intern(name)
+        self.access = _intern(access)
+        self.signature = _intern_optional(signature)
+        self.is_virtual = is_virtual
+        self.is_pure = is_pure
+        self.is_static = is_static
+        self.is_const = is_const
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MethodRecord':
+        return cls(**{key: data.get(key) for key in cls.__slots__ if key in data})
+
+
+class InterfaceRecord(Record):
+    """
+    A class or struct.
+
+    Phase1 fills the source positions, access sections and description;
+    phase2 fills usr, is_definition, file, line and base_usrs (the USR of
+    each base, '' if unknown). public_method_count is computed from methods,
+    and 'kind' is an alias of 'type'.
+    """
+
+    __slots__ = ('name', 'type', 'namespace', 'bases', 'methods', 'access_sections',
+                 'description', 'start_pos', 'end_pos', 'parent',
+                 'usr', 'is_definition', 'file', 'line', 'base_usrs')
+
+    COMPUTED = ('public_method_count',)
+    ALIASES = ('kind',)
+
+    def __init__(self, name: str, type: str = 'class', namespace: str = None,
+                 bases: List[str] = None, methods: List[MethodRecord] = None,
+                 access_sections: List[tuple] = None, description: str = None,
+                 start_pos: int = None, end_pos: int = None, parent: str = None,
+                 usr: str = None, is_definition: bool = None,
+                 file: str = None, line: int = None, base_usrs: List[str] = None):
+        self.name = _intern(name)
+        self.type = _intern(type)
+        self.namespace = _intern_optional(namespace)
+        self.bases = [_intern(base) for base in bases] if bases else []
+        self.methods = methods if methods is not None else []
+        self.access_sections = access_sections
+        self.description = description
+        self.start_pos = start_pos
+        self.end_pos = end_pos
+        self.parent = _intern_optional(parent)
+        self.usr = usr
+        self.is_definition = is_definition
+        self.file = _intern_optional(file)
+        self.line = line
+        self.base_usrs = base_usrs
+
+    @property
+    def public_method_count(self) -> int:
+        return sum(1 for method in self.methods if method.access == 'public')
+
+    @property
+    def kind(self) -> str:
+        return self.type
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'InterfaceRecord':
+        fields = {key: data[key] for key in cls.__slots__ if key in data}
+        if 'kind' in data and 'type' not in data:
+            fields['type'] = data['kind']
+        fields['methods'] = [MethodRecord.from_dict(m) for m in data.get('methods', [])]
+        if fields.get('access_sections') is not None:
+            fields['access_sections'] = [tuple(section) for section in fields['access_sections']]
+        return cls(**fields)
+
+
+class FileRecord(Record):
+    """The interfaces parsed from one header. interface_count is computed."""
+
+    __slots__ = ('file_path', 'namespace', 'interfaces')
+
+    COMPUTED = ('interface_count',)
+
+    def __init__(self, file_path: str, namespace: str = None,
+                 interfaces: List[InterfaceRecord] = None):
+        self.file_path = file_path
+        self.namespace = _intern_optional(namespace)
+        self.interfaces = interfaces if interfaces is not None else []
+
+    @property
+    def interface_count(self) -> int:
+        return len(self.interfaces)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FileRecord':
+        return cls(
+            file_path=data['file_path'],
+            namespace=data.get('namespace'),
+            interfaces=[InterfaceRecord.from_dict(i) for i in data.get('interfaces', [])]
+        )
@@ -0,0 +1,301 @@
+"""
+Indexed Result Store
+Writes parsed files, interfaces and methods to an SQLite database with
+indexes on name, namespace and file, and loads them back as records, so
+dashboards and diff tools can query results without re-running the analyzer.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Tuple
+
+from records import FileRecord, InterfaceRecord, MethodRecord
+
+
+# Bump when the table layout changes; older stores must be regenerated
+STORE_VERSION = 2
+
+SCHEMA = (
+    "CREATE TABLE files ("
+    " id INTEGER PRIMARY KEY,"
+    " file_path TEXT NOT NULL,"
+    " namespace TEXT)",
+    "CREATE TABLE interfaces ("
+    " id INTEGER PRIMARY KEY,"
+    " file_id INTEGER NOT NULL,"
+    " name TEXT NOT NULL,"
+    " type TEXT NOT NULL,"
+    " namespace TEXT,"
+    " parent TEXT,"
+    " bases TEXT NOT NULL,"
+    " description TEXT,"
+    " public_method_count INTEGER NOT NULL,"
+    " access_sections TEXT,"
+    " start_pos INTEGER,"
+    " end_pos INTEGER,"
+    " usr TEXT,"
+    " is_definition INTEGER,"
+    " file TEXT,"
+    " line INTEGER,"
+    " base_usrs TEXT)",
+    "CREATE TABLE methods ("
+    " interface_id INTEGER NOT NULL,"
+    " name TEXT NOT NULL,"
+    " access TEXT NOT NULL,"
+    " signature TEXT,"
+    " is_virtual INTEGER,"
+    " is_pure INTEGER,"
+    " is_static INTEGER,"
+    " is_const INTEGER)",
+)
+
+# Created after the bulk load, which is faster than maintaining them per row
+INDEXES = (
+    "CREATE UNIQUE INDEX idx_files_path ON files(file_path)",
+    "CREATE INDEX idx_interfaces_name ON interfaces(name)",
+    "CREATE INDEX idx_interfaces_namespace ON interfaces(namespace)",
+    "CREATE INDEX idx_interfaces_file ON interfaces(file_id)",
+    "CREATE INDEX idx_methods_interface ON methods(interface_id)",
+)
+
+INTERFACE_COLUMNS = ('id', 'file_id', 'name', 'type', 'namespace', 'parent', 'bases',
+                     'description', 'public_method_count', 'access_sections',
+                     'start_pos', 'end_pos', 'usr', 'is_definition', 'file', 'line',
+                     'base_usrs')
+METHOD_COLUMNS = ('interface_id', 'name', 'access', 'signature',
+                  'is_virtual', 'is_pure', 'is_static', 'is_const')
+
+# Interfaces fetched (and their methods looked up) per query; keeps the
+# IN (...) list under SQLite's parameter limit
+FETCH_ROWS = 500
+
+
+class ResultStoreWriter:
+    """
+    Writes a result store one parsed file at a time.
+
+    Rows go to a temporary database next to path, which replaces path on
+    close(), so readers never see a half-written store. Like
+    MarkdownTableWriter, it accepts the parsed file data from either parser
+    (records or plain dicts).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.total = 0
+        self._tmp_path = path + '.tmp'
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self._tmp_path)
+        self._conn.execute("PRAGMA journal_mode=OFF")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._file_id = 0
+
+    def add_file(self, file_data: Dict):
+        """Store one parsed file with its interfaces and their methods."""
+        self._file_id += 1
+        self._conn.execute(
+            "INSERT INTO files VALUES (?, ?, ?)",
+            (self._file_id, file_data.get('file_path', 'unknown'), file_data.get('namespace'))
+        )
+        interface_rows = []
+        method_rows = []
+        for interface in file_data.get('interfaces', []):
+            self.total += 1
+            sections = interface.get('access_sections')
+            base_usrs = interface.get('base_usrs')
+            interface_rows.append((
+                self.total,
+                self._file_id,
+                interface.get('name', 'Unknown'),
+                interface.get('type', interface.get('kind', 'class')),
+                interface.get('namespace'),
+                interface.get('parent'),
+                json.dumps(list(interface.get('bases', []))),
+                interface.get('description'),
+                interface.get('public_method_count', 0),
+                json.dumps([list(section) for section in sections]) if sections is not None else None,
+                interface.get('start_pos'),
+                interface.get('end_pos'),
+                interface.get('usr'),
+                interface.get('is_definition'),
+                interface.get('file'),
+                interface.get('line'),
+                json.dumps(list(base_usrs)) if base_usrs is not None else None,
+            ))
+            for method in interface.get('methods', []):
+                method_rows.append((self.total,) + tuple(
+                    method.get(column) for column in METHOD_COLUMNS[1:]))
+        self._conn.executemany(
+            f"INSERT INTO interfaces VALUES ({', '.join('?' * len(INTERFACE_COLUMNS))})",
+            interface_rows
+        )
+        self._conn.executemany(
+            f"INSERT INTO methods VALUES ({', '.join('?' * len(METHOD_COLUMNS))})",
+            method_rows
+        )
+
+    def close(self):
+        """Index the stored rows and move the store into place."""
+        for statement in INDEXES:
+            self._conn.execute(statement)
+        self._conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        self._conn.commit()
+        self._conn.close()
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._conn.close()
+            os.remove(self._tmp_path)
+
+
+class ResultStore:
+    """
+    Read access to a result store written by ResultStoreWriter.
+
+    files() loads everything back as FileRecords in the original order;
+    find_interfaces() answers indexed lookups by name, namespace or file.
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Result store not found: {path}")
+        self.path = path
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != STORE_VERSION:
+            self._conn.close()
+            raise ValueError(f"Result store {path} has version {version}, "
+                             f"expected {STORE_VERSION}; re-run the analyzer to regenerate it")
+
+    def count(self) -> int:
+        """Return the number of stored interfaces."""
+        return self._conn.execute("SELECT COUNT(*) FROM interfaces").fetchone()[0]
+
+    def files(self) -> Iterator[FileRecord]:
+        """Yield every stored file with its interfaces, in the order written."""
+        interfaces = self._interfaces("", ())
+        interface = next(interfaces, None)
+        for file_id, file_path, namespace in self._conn.execute(
+                "SELECT id, file_path, namespace FROM files ORDER BY id").fetchall():
+            record = FileRecord(file_path, namespace)
+            while interface is not None and interface[0] == file_id:
+                record.interfaces.append(interface[2])
+                interface = next(interfaces, None)
+            yield record
+
+    def find_interfaces(self, name: str = None, namespace: str = None,
+                        file_path: str = None) -> List[Tuple[str, InterfaceRecord]]:
+        """
+        Return the interfaces matching every given filter.
+
+        Args:
+            name: Interface name, exact or a glob pattern (e.g. 'Uart*')
+            namespace: Namespace, exact or a glob pattern (e.g. 'hal::*')
+            file_path: Relative file path, exact or a glob pattern
+
+        Returns:
+            List of (file path, interface record) in the order written
+        """
+        conditions = []
+        params = []
+        for column, value in (('i.name', name), ('i.namespace', namespace), ('f.file_path', file_path)):
+            if value is not None:
+                # Both use the column index (GLOB for a literal prefix)
+                operator = 'GLOB' if any(c in value for c in '*?[') else '='
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return [(path, record) for _, path, record in self._interfaces(where, params)]
+
+    def _interfaces(self, where: str, params) -> Iterator[Tuple[int, str, InterfaceRecord]]:
+        """Yield (file id, file path, record) for the selected interfaces, with methods."""
+        columns = ', '.join(f"i.{column}" for column in INTERFACE_COLUMNS)
+        rows = self._conn.execute(
+            f"SELECT {columns}, f.file_path FROM interfaces i JOIN files f ON f.id = i.file_id"
+            f"{where} ORDER BY i.id", params
+        )
+        while True:
+            chunk = rows.fetchmany(FETCH_ROWS)
+            if not chunk:
+                return
+            methods = self._methods([row[0] for row in chunk])
+            for row in chunk:
+                data = dict(zip(INTERFACE_COLUMNS, row))
+                yield data['file_id'], row[-1], _interface_record(data, methods.get(data['id'], []))
+
+    def _methods(self, interface_ids: List[int]) -> Dict[int, List[MethodRecord]]:
+        methods: Dict[int, List[MethodRecord]] = {}
+        placeholders = ', '.join('?' * len(interface_ids))
+        for row in self._conn.execute(
+                f"SELECT {', '.join(METHOD_COLUMNS)} FROM methods"
+                f" WHERE interface_id IN ({placeholders}) ORDER BY rowid", interface_ids):
+            flags = [None if value is None else bool(value) for value in row[4:]]
+            methods.setdefault(row[0], []).append(MethodRecord(row[1], row[2], row[3], *flags))
+        return methods
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _interface_record(data: Dict, methods: List[MethodRecord]) -> InterfaceRecord:
+    """Rebuild an InterfaceRecord from a row of the interfaces table."""
+    sections = data['access_sections']
+    base_usrs = data['base_usrs']
+    return InterfaceRecord(
+        name=data['name'],
+        type=data['type'],
+        namespace=data['namespace'],
+        bases=json.loads(data['bases']),
+        methods=methods,
+        access_sections=[tuple(section) for section in json.loads(sections)] if sections is not None else None,
+        description=data['description'],
+        start_pos=data['start_pos'],
+        end_pos=data['end_pos'],
+        parent=data['parent'],
+        usr=data['usr'],
+        is_definition=None if data['is_definition'] is None else bool(data['is_definition']),
+        file=data['file'],
+        line=data['line'],
+        base_usrs=json.loads(base_usrs) if base_usrs is not None else None,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+    from table_generator import MarkdownTableWriter, format_row
+
+    parser = argparse.ArgumentParser(description="Query a result store written with --store")
+    parser.add_argument("store", help="Result store (.sqlite3) to read")
+    parser.add_argument("--name", help="Interface name or glob pattern (e.g. 'Uart*')")
+    parser.add_argument("--namespace", help="Namespace or glob pattern (e.g. 'hal::*')")
+    parser.add_argument("--file", help="Relative header path or glob pattern")
+    parser.add_argument("--markdown", help="Regenerate the full markdown table into this file")
+    args = parser.parse_args()
+
+    with ResultStore(args.store) as store:
+        if args.markdown:
+            with open(args.markdown, 'w', encoding='utf-8') as f, MarkdownTableWriter(f) as writer:
+                for file_record in store.files():
+                    writer.add_file(file_record)
+            print(f"Table for {writer.total} interfaces written to: {args.markdown}")
+        else:
+            for path, interface in store.find_interfaces(args.name, args.namespace, args.file):
+                print(format_row(interface, path, None))
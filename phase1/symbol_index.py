@@ -0,0 +1,294 @@
+"""
+Project-wide Symbol Index
+Links every class/struct to its base and derived classes across headers and
+answers inheritance queries (implementations of an interface, inherited
+method sets) in O(edges) from a saved index, without re-parsing.
+"""
+
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from records import InterfaceRecord, MethodRecord
+
+
+# Bump when the index format changes so stale indexes are rebuilt
+INDEX_VERSION = 1
+
+TEMPLATE_ARGS_PATTERN = re.compile(r'<[^<>]*>')
+
+
+def _base_name(spelling: str) -> str:
+    """Return a spelled base class without template arguments or leading '::'."""
+    name = spelling.replace('typename', '').replace(' ', '')
+    previous = None
+    while previous != name:
+        previous, name = name, TEMPLATE_ARGS_PATTERN.sub('', name)
+    return name.lstrip(':')
+
+
+class SymbolIndex:
+    """
+    Classes and structs of a project with their inheritance graph.
+
+    Symbols are numbered in the order they are added and keyed by USR
+    (phase2) or fully qualified name (phase1). link() resolves each spelled
+    base to a symbol, through its USR when known or else by C++-style name
+    lookup from the derived class's scope, and builds adjacency lists for
+    base and derived edges. Bases that resolve to nothing (system or
+    third-party classes) are kept as external names.
+
+    Like the table writers, add_file() takes one parsed file at a time, so
+    the index can be filled while results stream past.
+    """
+
+    def __init__(self):
+        self.symbols: List[InterfaceRecord] = []
+        self.files: List[str] = []
+        self.keys: List[str] = []
+        self.by_key: Dict[str, int] = {}
+        self.duplicates = 0
+        self.bases: List[List[int]] = []
+        self.derived: List[List[int]] = []
+        self.external: List[List[str]] = []
+        self._linked = False
+
+    def add_file(self, file_data: Dict):
+        """Add the interfaces of one parsed file."""
+        file_path = file_data.get('file_path', 'unknown')
+        for interface in file_data.get('interfaces', []):
+            self.add(interface, file_path)
+
+    def add(self, interface: Dict, file_path: str) -> Optional[int]:
+        """Add one interface, returning its symbol id (None for a duplicate key)."""
+        symbol = InterfaceRecord(
+            name=interface['name'],
+            type=interface.get('type', interface.get('kind', 'class')),
+            namespace=interface.get('namespace') or None,
+            bases=list(interface.get('bases', [])),
+            methods=[m if isinstance(m, MethodRecord) else MethodRecord.from_dict(m)
+                     for m in interface.get('methods', [])],
+            description=interface.get('description') or None,
+            parent=interface.get('parent'),
+            usr=interface.get('usr') or None,
+            file=interface.get('file'),
+            line=interface.get('line'),
+            base_usrs=interface.get('base_usrs'),
+        )
+        key = symbol.usr or self._qualified(symbol)
+        if key in self.by_key:
+            # Same class seen again (another configuration of a header, or
+            # phase2 reporting it from several files): keep the first
+            self.duplicates += 1
+            return None
+        self.by_key[key] = len(self.symbols)
+        self.symbols.append(symbol)
+        self.files.append(file_path)
+        self.keys.append(key)
+        self._linked = False
+        return len(self.symbols) - 1
+
+    @staticmethod
+    def _qualified(symbol: InterfaceRecord) -> str:
+        return '::'.join(part for part in (symbol.namespace, symbol.parent, symbol.name) if part)
+
+    def qualified_name(self, symbol_id: int) -> str:
+        """Return the fully qualified name of a symbol."""
+        return self._qualified(self.symbols[symbol_id])
+
+    def link(self):
+        """Resolve every base to a symbol and build the base/derived adjacency lists."""
+        by_name: Dict[str, List[int]] = {}
+        by_qualified: Dict[str, int] = {}
+        for symbol_id, symbol in enumerate(self.symbols):
+            by_name.setdefault(symbol.name, []).append(symbol_id)
+            by_qualified.setdefault(self._qualified(symbol), symbol_id)
+
+        self.bases = [[] for _ in self.symbols]
+        self.external = [[] for _ in self.symbols]
+        for symbol_id, symbol in enumerate(self.symbols):
+            base_usrs = symbol.base_usrs or []
+            for i, spelling in enumerate(symbol.bases):
+                usr = base_usrs[i] if i < len(base_usrs) else ''
+                base_id = self.by_key.get(usr) if usr else None
+                if base_id is None:
+                    base_id = self._resolve(symbol, _base_name(spelling), by_qualified, by_name)
+                if base_id is None or base_id == symbol_id:
+                    self.external[symbol_id].append(spelling)
+                else:
+                    self.bases[symbol_id].append(base_id)
+        self._build_derived()
+
+    def _resolve(self, symbol: InterfaceRecord, name: str,
+                 by_qualified: Dict[str, int], by_name: Dict[str, List[int]]) -> Optional[int]:
+        """Look a base name up from the derived class's scope outwards, like C++."""
+        scope = [part for part in (symbol.namespace or '').split('::') if part]
+        if symbol.parent:
+            scope.append(symbol.parent)
+        for depth in range(len(scope), -1, -1):
+            candidate = '::'.join(scope[:depth] + [name])
+            if candidate in by_qualified:
+                return by_qualified[candidate]
+        # Names reached through using-declarations or typedefs: accept a
+        # unique class of that name anywhere in the project
+        matches = by_name.get(name.rsplit('::', 1)[-1], [])
+        return matches[0] if len(matches) == 1 else None
+
+    def _build_derived(self):
+        self.derived = [[] for _ in self.symbols]
+        for symbol_id, base_ids in enumerate(self.bases):
+            for base_id in base_ids:
+                self.derived[base_id].append(symbol_id)
+        self._linked = True
+
+    def _ensure_linked(self):
+        if not self._linked:
+            self.link()
+
+    @property
+    def edge_count(self) -> int:
+        self._ensure_linked()
+        return sum(len(base_ids) for base_ids in self.bases)
+
+    def lookup(self, name: str) -> List[int]:
+        """
+        Return the symbols matching a USR, a qualified name ('hal::IUart', a
+        leading '::' is ignored) or a plain class name ('IUart').
+        """
+        if name in self.by_key:
+            return [self.by_key[name]]
+        name = name.lstrip(':')
+        if '::' in name:
+            return [i for i in range(len(self.symbols)) if self.qualified_name(i) == name]
+        return [i for i, symbol in enumerate(self.symbols) if symbol.name == name]
+
+    def _walk(self, start: int, edges: List[List[int]]) -> List[int]:
+        """Breadth-first walk from start along edges, excluding start."""
+        seen = {start}
+        order = []
+        queue = deque([start])
+        while queue:
+            for next_id in edges[queue.popleft()]:
+                if next_id not in seen:
+                    seen.add(next_id)
+                    order.append(next_id)
+                    queue.append(next_id)
+        return order
+
+    def implementations(self, symbol_id: int) -> List[int]:
+        """Return every class deriving from a symbol, directly or indirectly."""
+        self._ensure_linked()
+        return self._walk(symbol_id, self.derived)
+
+    def ancestors(self, symbol_id: int) -> List[int]:
+        """Return every base of a symbol, nearest first."""
+        self._ensure_linked()
+        return self._walk(symbol_id, self.bases)
+
+    def inherited_methods(self, symbol_id: int, access: str = 'public') -> List[Tuple[MethodRecord, int]]:
+        """
+        Return the methods callable on a class, with the symbol declaring each.
+
+        Own methods come first, then those of its bases, nearest first. A
+        method hides base methods of the same name, and base constructors
+        and destructors are not inherited. Inheritance is assumed public.
+
+        Args:
+            symbol_id: Symbol to start from
+            access: Only methods with this access (None for all)
+        """
+        self._ensure_linked()
+        seen = set()
+        methods = []
+        for owner in [symbol_id] + self.ancestors(symbol_id):
+            owner_name = self.symbols[owner].name
+            hidden = set()
+            for method in self.symbols[owner].methods:
+                if owner != symbol_id and method.name in (owner_name, '~' + owner_name):
+                    continue
+                if method.name in seen:
+                    continue
+                hidden.add(method.name)
+                if access is None or method.access == access:
+                    methods.append((method, owner))
+            seen |= hidden
+        return methods
+
+    def save(self, path: str):
+        """Write the index (symbols and resolved base edges) to disk atomically."""
+        self._ensure_linked()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': INDEX_VERSION,
+                'keys': self.keys,
+                'files': self.files,
+                'symbols': [symbol.to_dict() for symbol in self.symbols],
+                'bases': self.bases,
+                'external': self.external,
+            }, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SymbolIndex':
+        """Load a saved index; derived edges are rebuilt from the base edges."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Symbol index {path} has version {data.get('version')}, "
+                             f"expected {INDEX_VERSION}; re-run the analyzer to rebuild it")
+        index = cls()
+        index.keys = data['keys']
+        index.files = data['files']
+        index.symbols = [InterfaceRecord.from_dict(symbol) for symbol in data['symbols']]
+        index.by_key = {key: i for i, key in enumerate(index.keys)}
+        index.bases = data['bases']
+        index.external = data['external']
+        index._build_derived()
+        return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query a symbol index written with --symbol-index")
+    parser.add_argument("index", help="Symbol index (.json) to read")
+    parser.add_argument("name", help="Class name, qualified name (e.g. 'hal::IUart') or USR")
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument("--implementations", action="store_true",
+                       help="List every class deriving from it (default)")
+    query.add_argument("--bases", action="store_true", help="List every base class")
+    query.add_argument("--methods", action="store_true",
+                       help="List its public methods, including inherited ones")
+    args = parser.parse_args()
+
+    index = SymbolIndex.load(args.index)
+    matches = index.lookup(args.name)
+    if not matches:
+        print(f"❌ No class named {args.name}")
+        raise SystemExit(1)
+
+    def describe(symbol_id: int) -> str:
+        symbol = index.symbols[symbol_id]
+        location = index.files[symbol_id] + (f":{symbol.line}" if symbol.line else "")
+        return f"{index.qualified_name(symbol_id)} ({symbol.type}, {location})"
+
+    for symbol_id in matches:
+        print(describe(symbol_id))
+        if args.methods:
+            for method, owner in index.inherited_methods(symbol_id):
+                signature = f" : {method.signature}" if method.signature else ""
+                inherited = f"  [from {index.qualified_name(owner)}]" if owner != symbol_id else ""
+                print(f"   {method.name}(){signature}{inherited}")
+        elif args.bases:
+            for base_id in index.ancestors(symbol_id):
+                print(f"   {describe(base_id)}")
+            for name in index.external[symbol_id]:
+                print(f"   {name} (external)")
+        else:
+            for derived_id in index.implementations(symbol_id):
+                print(f"   {describe(derived_id)}")
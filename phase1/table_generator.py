@@ -1,11 +1,318 @@
 """
 Table Generator for Interface Analysis Results
-Generates markdown tables from parsed interface data.
+Generates markdown tables (single or sharded), JSON Lines and CSV from parsed
+interface data, streaming one file at a time.
 """
 
-from typing import List, Dict
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import List, Dict, Optional, TextIO
 from datetime import datetime
 
+from records import to_plain
+
+
+TABLE_HEADER = "| Interface Name | File | Namespace | Type | Public Methods | Description |"
+TABLE_SEPARATOR = "|---------------|------|-----------|------|----------------|-------------|"
+
+CSV_FIELDS = ('name', 'file_path', 'namespace', 'type', 'bases', 'public_method_count', 'description')
+# Joins the bases column; base names may contain spaces and commas (Foo<int, char>) but never ';'
+CSV_BASES_SEPARATOR = ';'
+
+SHARD_KEYS = ('directory', 'namespace')
+INDEX_FILE = "index.md"
+# Shard files kept open at once by ShardedMarkdownWriter
+MAX_OPEN_SHARDS = 64
+SHARD_NAME_PATTERN = re.compile(r'[^A-Za-z0-9_.-]+')
+
+# Output buffer size for writers opened by open_writer()
+WRITE_BUFFER = 1024 * 1024
+
+
+def format_row(interface: Dict, file_path: str, namespace: str) -> str:
+    """Format one interface as a markdown table row."""
+    # Escape pipe characters in description
+    desc = interface.get('description', 'No description').replace('|', '\\|')
+    # Truncate long descriptions
+    if len(desc) > 100:
+        desc = desc[:97] + "..."
+    
+    # Truncate long file paths
+    if len(file_path) > 50:
+        file_path = "..." + file_path[-47:]
+    
+    return (
+        f"| {interface.get('name', 'Unknown')} | {file_path} | "
+        f"{interface.get('namespace') or namespace or 'global'} | "
+        f"{interface.get('type', 'class')} | {interface.get('public_method_count', 0)} | {desc} |"
+    )
+
+
+class TableWriter:
+    """
+    Base class for streaming result writers.
+    
+    add_file() takes one parsed file (records or plain dicts) at a time and
+    hands each interface to write_row(); close() finishes the output. Counts
+    by type and namespace are accumulated on the fly for the summaries.
+    Writers created by open_writer() own their output file and close it.
+    """
+    
+    def __init__(self, out: Optional[TextIO] = None):
+        self.out = out
+        self.owns_output = False
+        self.total = 0
+        self.type_counts: Dict[str, int] = {}
+        self.namespace_counts: Dict[str, int] = {}
+    
+    def add_file(self, file_data: Dict):
+        """Append the rows for one parsed file."""
+        file_path = file_data.get('file_path', 'unknown')
+        namespace = file_data.get('namespace', '')
+        
+        for interface in file_data.get('interfaces', []):
+            self.write_row(interface, file_path, namespace)
+            self.total += 1
+            interface_type = interface.get('type', 'class')
+            self.type_counts[interface_type] = self.type_counts.get(interface_type, 0) + 1
+            interface_namespace = interface.get('namespace') or namespace or 'global'
+            self.namespace_counts[interface_namespace] = self.namespace_counts.get(interface_namespace, 0) + 1
+    
+    def write_row(self, interface: Dict, file_path: str, namespace: str):
+        raise NotImplementedError
+    
+    def close(self):
+        """Finish the output (subclasses write trailers before calling this)."""
+        if self.owns_output:
+            self.out.close()
+    
+    def abort(self):
+        """Release resources after an error, without finishing the output."""
+        if self.owns_output:
+            self.out.close()
+    
+    def write_summary(self, out: TextIO):
+        """Write the markdown summary of interface counts."""
+        out.write("\n## Summary\n")
+        out.write(f"- **Total Interfaces:** {self.total}\n")
+        
+        out.write("\n### By Type:")
+        for interface_type, count in sorted(self.type_counts.items()):
+            out.write(f"\n- **{interface_type.capitalize()}:** {count}")
+        
+        if len(self.namespace_counts) > 1:
+            out.write("\n\n### By Namespace:")
+            for namespace, count in sorted(self.namespace_counts.items()):
+                out.write(f"\n- **{namespace}:** {count}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class MarkdownTableWriter(TableWriter):
+    """
+    Incremental markdown table writer.
+    
+    Rows are spooled to a temporary file as each parsed file is added and the
+    summary counts are accumulated on the fly, so memory does not grow with
+    the number of interfaces. close() writes the report header (which needs
+    the final total), the spooled rows and the summary to the output stream.
+    """
+    
+    def __init__(self, out: TextIO):
+        super().__init__(out)
+        self.generated = datetime.now()
+        self._rows = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+    
+    def write_row(self, interface: Dict, file_path: str, namespace: str):
+        self._rows.write(format_row(interface, file_path, namespace) + '\n')
+    
+    def close(self):
+        """Write the complete report to the output stream."""
+        out = self.out
+        
+        # Header
+        out.write("# C++ Interface Analysis Report\n")
+        out.write(f"\nGenerated: {self.generated.strftime('%Y-%m-%d %H:%M:%S')}\n")
+        out.write(f"\nTotal Interfaces Found: {self.total}\n\n")
+        
+        # Table
+        out.write(TABLE_HEADER + "\n")
+        out.write(TABLE_SEPARATOR + "\n")
+        self._rows.seek(0)
+        shutil.copyfileobj(self._rows, out)
+        self._rows.close()
+        
+        # Summary section
+        self.write_summary(out)
+        super().close()
+    
+    def abort(self):
+        self._rows.close()
+        super().abort()
+
+
+class JsonLinesWriter(TableWriter):
+    """Writes one JSON object per interface, with every parsed field (methods included)."""
+    
+    def write_row(self, interface: Dict, file_path: str, namespace: str):
+        row = {'file_path': file_path}
+        row.update(to_plain(interface))
+        row['namespace'] = interface.get('namespace') or namespace or None
+        self.out.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class CsvWriter(TableWriter):
+    """Writes one CSV row per interface with the table columns (bases added)."""
+    
+    def __init__(self, out: TextIO):
+        super().__init__(out)
+        self._csv = csv.writer(out)
+        self._csv.writerow(CSV_FIELDS)
+    
+    def write_row(self, interface: Dict, file_path: str, namespace: str):
+        self._csv.writerow((
+            interface.get('name', 'Unknown'),
+            file_path,
+            interface.get('namespace') or namespace or '',
+            interface.get('type', 'class'),
+            CSV_BASES_SEPARATOR.join(interface.get('bases', [])),
+            interface.get('public_method_count', 0),
+            interface.get('description', ''),
+        ))
+
+
+class ShardedMarkdownWriter(TableWriter):
+    """
+    Writes one markdown table per directory or namespace, plus an index.
+    
+    Rows are appended to their shard file as they arrive. At most
+    MAX_OPEN_SHARDS files are kept open at a time (least recently used are
+    closed and re-opened for appending), so the number of shards is not
+    limited by file handles. close() writes index.md with a link and count
+    per shard and the overall summary.
+    """
+    
+    def __init__(self, directory: str, shard_by: str = 'directory'):
+        super().__init__()
+        if shard_by not in SHARD_KEYS:
+            raise ValueError(f"Unknown shard key: {shard_by} (expected one of {', '.join(SHARD_KEYS)})")
+        self.directory = directory
+        self.shard_by = shard_by
+        self.generated = datetime.now()
+        self.shard_files: Dict[str, str] = {}    # Shard key -> file name
+        self.shard_counts: Dict[str, int] = {}
+        self._open: 'OrderedDict[str, TextIO]' = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+    
+    def shard_key(self, interface: Dict, file_path: str, namespace: str) -> str:
+        if self.shard_by == 'namespace':
+            return interface.get('namespace') or namespace or 'global'
+        return os.path.dirname(file_path.replace(os.sep, '/')) or '.'
+    
+    def write_row(self, interface: Dict, file_path: str, namespace: str):
+        key = self.shard_key(interface, file_path, namespace)
+        self._shard(key).write(format_row(interface, file_path, namespace) + '\n')
+        self.shard_counts[key] = self.shard_counts.get(key, 0) + 1
+    
+    def _shard(self, key: str) -> TextIO:
+        """Return the open file for a shard, creating or re-opening it."""
+        out = self._open.get(key)
+        if out is not None:
+            self._open.move_to_end(key)
+            return out
+        if len(self._open) >= MAX_OPEN_SHARDS:
+            self._open.popitem(last=False)[1].close()
+        name = self.shard_files.get(key)
+        if name is None:
+            name = self._file_name(key)
+            self.shard_files[key] = name
+            out = open(os.path.join(self.directory, name), 'w', encoding='utf-8', buffering=WRITE_BUFFER)
+            out.write(f"# Interfaces in `{key}`\n\n")
+            out.write(TABLE_HEADER + "\n")
+            out.write(TABLE_SEPARATOR + "\n")
+        else:
+            out = open(os.path.join(self.directory, name), 'a', encoding='utf-8', buffering=WRITE_BUFFER)
+        self._open[key] = out
+        return out
+    
+    def _file_name(self, key: str) -> str:
+        """Return a unique, filesystem-safe file name for a shard key."""
+        base = SHARD_NAME_PATTERN.sub('_', key.replace('::', '.')).strip('_.') or 'root'
+        used = set(self.shard_files.values())
+        name = f"{base}.md"
+        suffix = 2
+        while name in used or name == INDEX_FILE:
+            name = f"{base}-{suffix}.md"
+            suffix += 1
+        return name
+    
+    def close(self):
+        """Close the shard files and write the index."""
+        while self._open:
+            self._open.popitem()[1].close()
+        
+        with open(os.path.join(self.directory, INDEX_FILE), 'w', encoding='utf-8') as out:
+            out.write("# C++ Interface Analysis Report\n")
+            out.write(f"\nGenerated: {self.generated.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            out.write(f"\nTotal Interfaces Found: {self.total} in {len(self.shard_files)} tables "
+                      f"(by {self.shard_by})\n\n")
+            out.write(f"| {self.shard_by.capitalize()} | Interfaces |\n")
+            out.write("|------|------------|\n")
+            for key in sorted(self.shard_files):
+                out.write(f"| [{key}]({self.shard_files[key]}) | {self.shard_counts[key]} |\n")
+            self.write_summary(out)
+    
+    def abort(self):
+        while self._open:
+            self._open.popitem()[1].close()
+
+
+# Output formats for open_writer()
+WRITERS = {
+    'markdown': MarkdownTableWriter,
+    'jsonl': JsonLinesWriter,
+    'csv': CsvWriter,
+    'markdown-shards': ShardedMarkdownWriter,
+}
+
+
+def open_writer(path: str, output_format: str = 'markdown', shard_by: str = 'directory') -> TableWriter:
+    """
+    Create a writer for an output format.
+    
+    Args:
+        path: Output file, or output directory for 'markdown-shards'
+        output_format: One of WRITERS
+        shard_by: Shard key for 'markdown-shards' ('directory' or 'namespace')
+    
+    Returns:
+        A TableWriter that owns (and closes) its output
+    """
+    if output_format == 'markdown-shards':
+        return ShardedMarkdownWriter(path, shard_by)
+    writer_class = WRITERS[output_format]
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # The csv module writes its own line endings
+    out = open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER,
+               newline='' if output_format == 'csv' else None)
+    writer = writer_class(out)
+    writer.owns_output = True
+    return writer
+
 
 def generate_markdown_table(interfaces_data: List[Dict], output_file: str = None) -> str:
     """
@@ -18,79 +325,11 @@ def generate_markdown_table(interfaces_data: List[Dict], output_file: str = None
     Returns:
         Markdown table as string
     """
-    # Collect all interfaces from all files
-    all_interfaces = []
-    
-    for file_data in interfaces_data:
-        file_path = file_data.get('file_path', 'unknown')
-        namespace = file_data.get('namespace', '')
-        
-        for interface in file_data.get('interfaces', []):
-            all_interfaces.append({
-                'name': interface.get('name', 'Unknown'),
-                'file': file_path,
-                'namespace': namespace or 'global',
-                'type': interface.get('type', 'class'),
-                'methods': interface.get('public_method_count', 0),
-                'description': interface.get('description', 'No description')
-            })
-    
-    # Generate table
-    table_lines = []
-    
-    # Header
-    table_lines.append("# C++ Interface Analysis Report")
-    table_lines.append(f"\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    table_lines.append(f"\nTotal Interfaces Found: {len(all_interfaces)}\n")
-    
-    # Table header
-    table_lines.append("| Interface Name | File | Namespace | Type | Public Methods | Description |")
-    table_lines.append("|---------------|------|-----------|------|----------------|-------------|")
-    
-    # Table rows
-    for interface in all_interfaces:
-        # Escape pipe characters in description
-        desc = interface['description'].replace('|', '\\|')
-        # Truncate long descriptions
-        if len(desc) > 100:
-            desc = desc[:97] + "..."
-        
-        # Truncate long file paths
-        file_path = interface['file']
-        if len(file_path) > 50:
-            file_path = "..." + file_path[-47:]
-        
-        table_lines.append(
-            f"| {interface['name']} | {file_path} | {interface['namespace']} | "
-            f"{interface['type']} | {interface['methods']} | {desc} |"
-        )
-    
-    # Summary section
-    table_lines.append("\n## Summary")
-    table_lines.append(f"- **Total Interfaces:** {len(all_interfaces)}")
-    
-    # Count by type
-    type_counts = {}
-    for interface in all_interfaces:
-        interface_type = interface['type']
-        type_counts[interface_type] = type_counts.get(interface_type, 0) + 1
-    
-    table_lines.append("\n### By Type:")
-    for interface_type, count in sorted(type_counts.items()):
-        table_lines.append(f"- **{interface_type.capitalize()}:** {count}")
-    
-    # Count by namespace
-    namespace_counts = {}
-    for interface in all_interfaces:
-        namespace = interface['namespace']
-        namespace_counts[namespace] = namespace_counts.get(namespace, 0) + 1
-    
-    if len(namespace_counts) > 1:
-        table_lines.append("\n### By Namespace:")
-        for namespace, count in sorted(namespace_counts.items()):
-            table_lines.append(f"- **{namespace}:** {count}")
-    
-    markdown_content = '\n'.join(table_lines)
+    buffer = io.StringIO()
+    with MarkdownTableWriter(buffer) as writer:
+        for file_data in interfaces_data:
+            writer.add_file(file_data)
+    markdown_content = buffer.getvalue()
     
     # Write to file if specified
     if output_file:
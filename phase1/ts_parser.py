@@ -0,0 +1,258 @@
+"""
+Tree-sitter Parser for C++ Interfaces
+Produces the same interface records as basic_parser.parse_header_file using a
+real C++ grammar, and re-parses edited buffers incrementally.
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from basic_parser import extract_namespace, CommentIndex
+from records import FileRecord, InterfaceRecord, MethodRecord
+
+try:
+    from tree_sitter import Language, Parser
+    import tree_sitter_cpp
+    TREE_SITTER_AVAILABLE = True
+except ImportError:
+    TREE_SITTER_AVAILABLE = False
+
+
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+CLASS_NODES = {'class_specifier': 'class', 'struct_specifier': 'struct'}
+# Member declarations that can declare a member function
+MEMBER_NODES = {'field_declaration', 'declaration', 'function_definition'}
+# Nodes that can contain class definitions; everything else (function bodies,
+# expressions, parameter lists) is never descended into
+CONTAINER_NODES = {'translation_unit', 'namespace_definition', 'declaration_list',
+                   'linkage_specification', 'template_declaration', 'declaration',
+                   'field_declaration', 'type_definition', 'field_declaration_list',
+                   'class_specifier', 'struct_specifier', 'preproc_if', 'preproc_ifdef',
+                   'preproc_else', 'preproc_elif', 'ERROR'}
+DECLARATOR_WRAPPERS = {'pointer_declarator', 'reference_declarator', 'init_declarator',
+                       'attributed_declarator'}
+
+
+TREE_SITTER_INSTALL_HINT = "pip install 'tree-sitter>=0.22' 'tree-sitter-cpp>=0.22'"
+
+
+def _create_parser():
+    if not TREE_SITTER_AVAILABLE:
+        raise ImportError(f"tree-sitter is required. Install with: {TREE_SITTER_INSTALL_HINT}")
+    try:
+        return Parser(Language(tree_sitter_cpp.language()))
+    except TypeError:
+        # Older tree-sitter releases take a shared library path instead
+        raise ImportError(f"tree-sitter >= 0.22 is required. Upgrade with: {TREE_SITTER_INSTALL_HINT}") from None
+
+
+def _text(node) -> str:
+    return node.text.decode('utf-8', errors='ignore')
+
+
+def _common_prefix(a: bytes, b: bytes, limit: int, reverse: bool = False) -> int:
+    """Return the length of the common prefix (or suffix) of a and b, up to limit."""
+    chunk = 4096
+    n = 0
+    while n < limit:
+        step = min(chunk, limit - n)
+        if reverse:
+            same = a[len(a) - n - step:len(a) - n] == b[len(b) - n - step:len(b) - n]
+        else:
+            same = a[n:n + step] == b[n:n + step]
+        if not same:
+            if step == 1:
+                break
+            chunk = max(1, step // 2)
+            continue
+        n += step
+    return n
+
+
+def _point(data: bytes, offset: int) -> Tuple[int, int]:
+    """Return the (row, column) of a byte offset."""
+    row = data.count(b'\n', 0, offset)
+    return row, offset - (data.rfind(b'\n', 0, offset) + 1)
+
+
+def _byte_to_char(content: str, data: bytes):
+    """Return a function mapping byte offsets in data to character offsets in content."""
+    if len(data) == len(content):
+        return lambda offset: offset
+    # Byte offset of each multi-byte character and the extra bytes up to it
+    starts = []
+    extra = [0]
+    for match in NON_ASCII_PATTERN.finditer(content):
+        starts.append(match.start() + extra[-1])
+        extra.append(extra[-1] + len(match.group().encode('utf-8')) - 1)
+    return lambda offset: offset - extra[bisect_left(starts, offset)]
+
+
+def _class_name(node) -> Optional[str]:
+    name = node.child_by_field_name('name')
+    while name is not None and name.type in ('qualified_identifier', 'template_type'):
+        name = name.child_by_field_name('name')
+    return _text(name) if name is not None else None
+
+
+def _bases(node) -> List[str]:
+    for child in node.children:
+        if child.type == 'base_class_clause':
+            return [''.join(_text(c).split()) for c in child.named_children
+                    if c.type not in ('access_specifier', 'virtual')]
+    return []
+
+
+def _method_name(node) -> Optional[str]:
+    """Return the member function declared by a member declaration node, or None."""
+    declarator = node.child_by_field_name('declarator')
+    while declarator is not None:
+        if declarator.type == 'function_declarator':
+            inner = declarator.child_by_field_name('declarator')
+            if inner is None or inner.type == 'parenthesized_declarator':
+                return None  # Function pointer member
+            return ''.join(_text(inner).split())
+        if declarator.type not in DECLARATOR_WRAPPERS:
+            return None
+        declarator = declarator.child_by_field_name('declarator') or \
+            (declarator.named_children[-1] if declarator.named_children else None)
+    return None
+
+
+class TreeSitterParser:
+    """
+    Header parser backed by tree-sitter-cpp.
+
+    Keeps the last tree for each file so that parsing a new version of the
+    same file applies a tree-sitter edit and re-parses incrementally, reusing
+    every unchanged subtree.
+    """
+
+    def __init__(self, keep_trees: bool = True):
+        self.parser = _create_parser()
+        self.keep_trees = keep_trees
+        self.trees: Dict[str, Tuple[bytes, object]] = {}
+
+    def parse_tree(self, file_path: str, data: bytes):
+        """Parse bytes, incrementally if an earlier version of the file was parsed."""
+        previous = self.trees.get(file_path)
+        if previous is None:
+            tree = self.parser.parse(data)
+        elif previous[0] == data:
+            tree = previous[1]
+        else:
+            old_data, old_tree = previous
+            # Single edit spanning the changed region: common prefix/suffix
+            limit = min(len(old_data), len(data))
+            start = _common_prefix(old_data, data, limit)
+            suffix = _common_prefix(old_data, data, limit - start, reverse=True)
+            old_end = len(old_data) - suffix
+            new_end = len(data) - suffix
+            old_tree.edit(
+                start_byte=start,
+                old_end_byte=old_end,
+                new_end_byte=new_end,
+                start_point=_point(old_data, start),
+                old_end_point=_point(old_data, old_end),
+                new_end_point=_point(data, new_end),
+            )
+            tree = self.parser.parse(data, old_tree)
+        if self.keep_trees:
+            self.trees[file_path] = (data, tree)
+        return tree
+
+    def parse_header_file(self, file_path: str, content: str) -> FileRecord:
+        """
+        Parse a C++ header file and extract interface information.
+
+        Returns:
+            FileRecord with file info and extracted interfaces, in the same
+            format as basic_parser.parse_header_file
+        """
+        data = content.encode('utf-8')
+        tree = self.parse_tree(file_path, data)
+
+        to_char = _byte_to_char(content, data)
+
+        interfaces = []
+        comments = CommentIndex(content)
+        self._visit(tree.root_node, [], None, content, to_char, comments, interfaces)
+        interfaces.sort(key=lambda i: i.start_pos)
+
+        return FileRecord(file_path, extract_namespace(content), interfaces)
+
+    def _visit(self, node, namespaces: List[str], parent: Optional[str],
+               content: str, to_char, comments: CommentIndex, interfaces: List[InterfaceRecord]):
+        if node.type == 'namespace_definition':
+            name = node.child_by_field_name('name')
+            namespaces = namespaces + [''.join(_text(name).split())] if name is not None else namespaces
+        elif node.type in CLASS_NODES and node.child_by_field_name('body') is not None:
+            name = _class_name(node)
+            if name:
+                interface = self._interface(node, name, namespaces, parent, content, to_char, comments)
+                interfaces.append(interface)
+                parent = name
+        for child in node.named_children:
+            if child.type in CONTAINER_NODES or child.type in CLASS_NODES:
+                self._visit(child, namespaces, parent, content, to_char, comments, interfaces)
+
+    def _interface(self, node, name: str, namespaces: List[str], parent: Optional[str],
+                   content: str, to_char, comments: CommentIndex) -> InterfaceRecord:
+        kind = CLASS_NODES[node.type]
+        body = node.child_by_field_name('body')
+        access = 'private' if kind == 'class' else 'public'
+        section_start = to_char(body.start_byte) + 1
+        sections = []
+        methods = []
+
+        def close_section(end):
+            if content[section_start:end].strip():
+                sections.append((access, section_start, end))
+
+        for member in body.named_children:
+            if member.type == 'access_specifier':
+                close_section(to_char(member.start_byte))
+                access = _text(member)
+                colon = member.next_sibling
+                section_start = to_char(colon.end_byte if colon is not None and colon.type == ':'
+                                        else member.end_byte)
+                continue
+            if member.type == 'template_declaration' and member.named_children:
+                member = member.named_children[-1]
+            if member.type in MEMBER_NODES:
+                method = _method_name(member)
+                if method:
+                    methods.append(MethodRecord(method, access))
+        close_section(to_char(body.end_byte) - 1)
+
+        start_pos = to_char(node.start_byte)
+        return InterfaceRecord(
+            name=name,
+            type=kind,
+            namespace='::'.join(namespaces) or None,
+            bases=_bases(node),
+            methods=methods,
+            access_sections=sections,
+            description=comments.description_before(start_pos),
+            start_pos=start_pos,
+            end_pos=to_char(node.end_byte),
+            parent=parent or None,
+        )
+
+
+_parser = None
+
+
+def parse_header_file(file_path: str, content: str) -> FileRecord:
+    """
+    Parse a header with a shared per-process TreeSitterParser.
+
+    Batch runs see each file once, so no trees are retained; create a
+    TreeSitterParser directly to re-parse edited buffers incrementally.
+    """
+    global _parser
+    if _parser is None:
+        _parser = TreeSitterParser(keep_trees=False)
+    return _parser.parse_header_file(file_path, content)
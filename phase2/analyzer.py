@@ -5,47 +5,229 @@ Scans provided directory and runs AST extraction to generate documentation table
 
 import sys
 import os
+import tempfile
 from pathlib import Path
 from typing import List
-from ast_parser import extract_classes, print_class_table
-
-def find_headers(directory: str, exts=None, exclude_dirs=None) -> List[str]:
-    exts = exts or ['.h', '.hpp']
-    exclude_dirs = exclude_dirs or {'.git', 'build', 'cmake-build', 'venv', 'output'}
-    result = []
-    for root, dirs, files in os.walk(directory):
-        # Exclude dirs
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        for f in files:
-            if any(f.endswith(ext) for ext in exts):
-                result.append(os.path.join(root, f))
-    return result
+
+# Share infrastructure modules with phase1
+sys.path.append(str(Path(__file__).parent.parent / 'phase1'))
+
+from ast_parser import print_class_table, parse_options, build_pch, dedupe_classes, DEFAULT_ARGS
+from ast_pool import parse_headers
+from compile_db import CompileFlagsIndex
+from manifest import FileManifest, content_hash
+from file_scanner import iter_header_files
+from records import FileRecord, InterfaceRecord
+from result_store import ResultStoreWriter
+from table_generator import open_writer, WRITERS, SHARD_KEYS
+from symbol_index import SymbolIndex
+from include_graph import IncludeGraph, scan_includes
+from tu_cache import TUCache, DEFAULT_CACHE_DIR as TU_CACHE_DIR, DEFAULT_MAX_BYTES as TU_CACHE_BYTES
+
+# Excluded in addition to the shared scanner defaults
+PHASE2_EXCLUDE = ['output']
+
+def find_headers(directory: str, exts=None, exclude_dirs=None, **options) -> List[str]:
+    """Return header paths in sorted order using the shared phase1 scanner."""
+    exclude = list(exclude_dirs or PHASE2_EXCLUDE)
+    files = iter_header_files(directory, exclude=exclude, extensions=exts, **options)
+    return [f['path'] for f in files]
+
+def project_includes(included: List[str], directory: str) -> List[str]:
+    """Return the included paths under directory, relative to it."""
+    paths = []
+    for path in included:
+        relative = os.path.relpath(os.path.abspath(path), os.path.abspath(directory))
+        if not relative.startswith('..'):
+            paths.append(relative.replace(os.sep, '/'))
+    return paths
 
 def main():
     import argparse
     parser = argparse.ArgumentParser("Phase 2: C++ AST Interface Analyzer")
     parser.add_argument('directory', help="Directory to scan for headers")
-    parser.add_argument('-o', '--output', help="Output table file", default="ast_interfaces_table.md")
+    parser.add_argument('-o', '--output', help="Output file for --format (a directory for markdown-shards)", default="ast_interfaces_table.md")
+    parser.add_argument('--format', choices=list(WRITERS), default=None, help="Also write the classes to --output as markdown, jsonl, csv or markdown-shards")
+    parser.add_argument('--shard-by', choices=SHARD_KEYS, default='directory', help="How --format markdown-shards splits the table (default: directory)")
     parser.add_argument('--max', type=int, default=None, help="Maximum files to analyze")
+    parser.add_argument('--incremental', action='store_true', help="Only re-parse headers changed since the last run")
+    parser.add_argument('--manifest', default=None, help="Manifest file for --incremental (default: <output>.manifest.json)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Number of parser processes, 0 for all cores")
+    parser.add_argument('--fast', action='store_true', help="Fast interface mode: skip function bodies, allow incomplete TUs")
+    parser.add_argument('--prefix-header', default=None, help="Common prefix header to precompile once and reuse for every header")
+    parser.add_argument('--pch', default=None, help="Where to write the precompiled prefix header (default: temporary file)")
+    parser.add_argument('--tu-cache', action='store_true', help="Save parsed translation units and reload unchanged headers instead of re-parsing them")
+    parser.add_argument('--tu-cache-dir', default=TU_CACHE_DIR, help="Translation-unit cache directory (default: ~/.cache/cpp-interface-analyzer/tu)")
+    parser.add_argument('--tu-cache-size', type=int, default=TU_CACHE_BYTES // 2**20, help="Translation-unit cache size limit in MB; least recently used entries are evicted (default: %(default)s)")
+    parser.add_argument('-p', '--compile-commands', default=None, help="Build directory containing compile_commands.json")
+    parser.add_argument('--build-only', action='store_true', help="With --compile-commands, only analyze headers that are part of the build")
+    parser.add_argument('--project-root', action='append', default=None, help="Also report classes from included headers under this directory (repeatable)")
+    parser.add_argument('--all-includes', action='store_true', help="Report classes from every included file, including system headers")
+    parser.add_argument('--exclude', action='append', default=None, help="gitignore-style pattern to exclude, e.g. 'out-*/' (repeatable)")
+    parser.add_argument('--include', action='append', default=None, help="gitignore-style pattern headers must match, e.g. 'src/**' (repeatable)")
+    parser.add_argument('--git-files', action='store_true', help="List headers with git ls-files instead of walking the tree")
+    parser.add_argument('--scan-workers', type=int, default=1, help="Threads scanning top-level directories in parallel")
+    parser.add_argument('--symbol-index', default=None, help="Also save a symbol index with the inheritance graph (e.g. ast_symbols.json)")
+    parser.add_argument('--store', default=None, help="Also write the classes to an indexed SQLite store (e.g. ast_interfaces.sqlite3)")
+    parser.add_argument('--include-graph', default=None, help="Also save the include dependency graph (e.g. ast_includes.json)")
     args = parser.parse_args()
 
-    files = find_headers(args.directory)
+    files = find_headers(args.directory, exclude_dirs=PHASE2_EXCLUDE + (args.exclude or []),
+                         include=args.include, use_git=args.git_files, workers=args.scan_workers)
+
+    flags_index = None
+    if args.compile_commands:
+        flags_index = CompileFlagsIndex(args.compile_commands)
+        print(f"Loaded {flags_index.command_count} compile commands from {args.compile_commands}")
+        if args.build_only:
+            files = [f for f in files if flags_index.is_in_build(f)]
+
     if args.max:
         files = files[:args.max]
     print(f"Scanning {len(files)} files in {args.directory}")
 
-    all_classes = []
-    for i, f in enumerate(files):
+    manifest = None
+    if args.incremental:
+        manifest = FileManifest(args.manifest or args.output + '.manifest.json', schema='phase2',
+                                load=lambda classes: [InterfaceRecord.from_dict(cl) for cl in classes])
+
+    relpaths = {f: os.path.relpath(f, args.directory) for f in files}
+    # Content hashes of headers already read, reused when they are recorded
+    # in the manifest so no header is read again just to hash it
+    digests = {}
+    def read_header(f):
+        with open(f, 'r', encoding='utf-8', errors='ignore') as fh:
+            content = fh.read()
+        if manifest:
+            digests[f] = content_hash(content)
+        return content
+
+    include_graph = IncludeGraph()
+    for f in files:
+        # Includes recorded by libclang on earlier runs are already resolved;
+        # otherwise a fast #include scan orders the parse work
+        recorded = manifest.includes(relpaths[f]) if manifest else None
+        if recorded is not None:
+            include_graph.add_file(relpaths[f], recorded, resolved=True)
+        else:
+            include_graph.add_file(relpaths[f], scan_includes(read_header(f)))
+
+    file_classes = {}
+    to_parse = []
+    affected = None
+    if manifest:
+        # A header's classes depend on everything it includes, so re-parse
+        # every header that includes a changed or deleted one, directly or not
+        changed = [relpaths[f] for f in files if manifest.changed(relpaths[f], f)]
+        changed += manifest.stale(relpaths.values())
+        affected = set(include_graph.affected(changed))
+    for f in files:
+        if manifest and relpaths[f].replace(os.sep, '/') not in affected:
+            previous = manifest.lookup(relpaths[f], f)
+            if previous is not None:
+                file_classes[f] = previous
+                continue
+        to_parse.append(f)
+    if manifest and len(affected) > len(changed):
+        print(f"Incremental: {len(changed)} changed headers affect {len(affected)} headers")
+
+    # Parse shared dependencies before the headers that include them
+    by_relpath = {relpath: f for f, relpath in relpaths.items()}
+    to_parse = [by_relpath[relpath] for relpath in
+                include_graph.topological_order(relpaths[f] for f in to_parse)]
+
+    options = parse_options(fast=args.fast)
+    file_args = {}
+    if flags_index:
+        file_args = {f: flags_index.flags_for(f) or DEFAULT_ARGS for f in to_parse}
+        matched = sum(1 for f in to_parse if flags_index.flags_for(f))
+        print(f"Using compile flags for {matched}/{len(to_parse)} headers")
+
+    scope = {'main_only': not args.all_includes, 'roots': args.project_root}
+
+    pch_dir = None
+    if args.prefix_header and to_parse:
+        pch_path = args.pch
+        if not pch_path:
+            pch_dir = tempfile.TemporaryDirectory(prefix='ast_pch_')
+            pch_path = os.path.join(pch_dir.name, 'prefix.pch')
         try:
-            classes = extract_classes(f)
-            print(f"[{i+1}/{len(files)}] {os.path.basename(f)}: found {len(classes)} class/struct")
-            all_classes.extend(classes)
+            prefix_args = flags_index.flags_for(args.prefix_header) if flags_index else None
+            pch_args = build_pch(args.prefix_header, pch_path, prefix_args)
+            file_args = {f: file_args.get(f, DEFAULT_ARGS) + pch_args for f in to_parse}
+            print(f"Precompiled {args.prefix_header} -> {pch_path}")
         except Exception as e:
-            print(f"  Error in {f}: {e}")
+            print(f"  Could not precompile {args.prefix_header}: {e}, parsing without PCH")
+
+    tu_cache_dir = args.tu_cache_dir if args.tu_cache else None
+    if tu_cache_dir and args.prefix_header and not args.pch:
+        print("  The temporary PCH path changes every run, so cached translation units will not be reused; pass --pch")
+
+    collect_includes = bool(manifest or args.include_graph)
+    for i, (f, classes, error, included) in enumerate(parse_headers(to_parse, jobs=args.jobs, options=options,
+                                                                    file_args=file_args, scope=scope,
+                                                                    includes=collect_includes,
+                                                                    tu_cache_dir=tu_cache_dir)):
+        if error:
+            print(f"  Error in {f}: {error}")
+            continue
+        print(f"[{i+1}/{len(to_parse)}] {os.path.basename(f)}: found {len(classes)} class/struct")
+        file_classes[f] = classes
+        if included is not None:
+            included = project_includes(included, args.directory)
+            include_graph.add_file(relpaths[f], included, resolved=True)
+        if manifest:
+            digest = digests.pop(f, None) or manifest.known_hash(f) or content_hash(read_header(f))
+            manifest.update(relpaths[f], f, None, classes, includes=included, digest=digest)
+
+    if pch_dir:
+        pch_dir.cleanup()
+
+    if tu_cache_dir:
+        tu_cache = TUCache(tu_cache_dir, max_bytes=args.tu_cache_size * 2**20)
+        evicted = tu_cache.evict()
+        count, size = tu_cache.size()
+        print(f"TU cache: {count} translation units, {size / 2**20:.0f} MB, evicted {evicted}")
+
+    if manifest:
+        removed = manifest.prune(relpaths[f] for f in files)
+        manifest.save()
+        print(f"Incremental: reused {manifest.reused}, re-parsed {manifest.updated}, removed {removed}")
+
+    # Merge per-file results in scan order, one entry per class
+    all_classes = dedupe_classes([cl for f in files for cl in file_classes.get(f, [])])
 
     # Print table to stdout
     print_class_table(all_classes)
-    # TODO: Call table_generator to save as markdown/csv/json here
+
+    # Each class under the file it was first reported for, in scan order
+    kept = set(map(id, all_classes))
+    file_records = [FileRecord(relpaths[f],
+                               interfaces=[cl for cl in file_classes.get(f, []) if id(cl) in kept])
+                    for f in files]
+
+    if args.format:
+        with open_writer(args.output, args.format, args.shard_by) as writer:
+            for record in file_records:
+                writer.add_file(record)
+        print(f"Wrote {writer.total} classes to {args.output} ({args.format})")
+
+    if args.store:
+        with ResultStoreWriter(args.store) as store:
+            for record in file_records:
+                store.add_file(record)
+        print(f"Result store: {args.store} ({store.total} classes)")
+
+    if args.symbol_index:
+        symbols = SymbolIndex()
+        for record in file_records:
+            symbols.add_file(record)
+        symbols.save(args.symbol_index)
+        print(f"Symbol index: {args.symbol_index} ({len(symbols.symbols)} classes, {symbols.edge_count} inheritance edges)")
+
+    if args.include_graph:
+        include_graph.save(args.include_graph)
+        print(f"Include graph: {args.include_graph} ({len(include_graph.files)} headers, {include_graph.edge_count} project includes)")
 
 if __name__ == "__main__":
     main()
@@ -6,12 +6,15 @@ Parse C++ files to extract class, struct, interface information for documentatio
 
 import os
 import sys
-from clang.cindex import Index, CursorKind, Config, AccessSpecifier
+from clang.cindex import Index, CursorKind, Config, AccessSpecifier, TranslationUnit
 from typing import List, Dict
 
+# Record types are shared with phase1
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'phase1'))
+from records import InterfaceRecord, MethodRecord
+
 # Attempt to configure libclang location if needed (common defaults)
 def try_configure_libclang():
-    import platform
     from clang.cindex import Config
     if Config.loaded:
         return
@@ -31,6 +34,10 @@ try:
 except Exception:
     try_configure_libclang()
 
+# Used when no compile flags are known for a header. Headers are parsed on
+# their own, so force C++ (libclang would otherwise treat .h as C).
+DEFAULT_ARGS = ['-x', 'c++', '-std=c++14']
+
 # Helper for access specifier
 ACCESS = {
     AccessSpecifier.PUBLIC: 'public',
@@ -40,44 +47,151 @@ ACCESS = {
 }
 
 
-def extract_classes(filename: str, extra_args=None) -> List[Dict]:
-    """Parse a header file and return all C++ class/struct/interface info."""
-    index = Index.create()
-    extra_args = extra_args or ['-std=c++14']  # Add include dirs if needed
+def parse_options(fast: bool = False, detailed_record: bool = False) -> int:
+    """Return libclang parse flags.
+
+    Fast interface mode skips inline function bodies (we only read
+    declarations) and tolerates incomplete translation units, as headers are
+    parsed on their own. The detailed preprocessing record (macro expansions
+    and inclusion directives as cursors) is only built when asked for.
+    """
+    options = TranslationUnit.PARSE_NONE
+    if fast:
+        options |= TranslationUnit.PARSE_SKIP_FUNCTION_BODIES | TranslationUnit.PARSE_INCOMPLETE
+    if detailed_record:
+        options |= TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
+    return options
+
+
+def _without_language(args: List[str]) -> List[str]:
+    """Drop '-x <language>' pairs from compiler args."""
+    result = []
+    items = iter(args)
+    for arg in items:
+        if arg == '-x':
+            next(items, None)
+        elif not arg.startswith('-x'):
+            result.append(arg)
+    return result
+
+
+def build_pch(prefix_header: str, pch_path: str, extra_args=None, index: Index = None) -> List[str]:
+    """Precompile a common prefix header and return the args that load it.
+
+    Every translation unit parsed with the returned args appended loads the
+    PCH instead of re-parsing the prefix header's includes (vendor HAL,
+    CMSIS, STL...). The TUs must use flags compatible with ``extra_args``.
+    """
+    index = index or Index.create()
+    extra_args = _without_language(extra_args or DEFAULT_ARGS)
+
+    tu = index.parse(prefix_header, args=['-x', 'c++-header'] + extra_args,
+                     options=TranslationUnit.PARSE_INCOMPLETE)
+    errors = [d for d in tu.diagnostics if d.severity >= d.Error]
+    if errors:
+        raise RuntimeError(f"Cannot precompile {prefix_header}: {errors[0]}")
+    tu.save(pch_path)
+    return ['-include-pch', pch_path]
+
+
+def _location_filter(main_file: str, roots: List[str] = None):
+    """Return a predicate telling whether a cursor's file should be visited.
+
+    The main file is always in scope; files under ``roots`` are too. Results
+    are memoized per file name, as every cursor in a file shares it.
+    """
+    main_file = os.path.realpath(main_file)
+    roots = [os.path.join(os.path.realpath(r), '') for r in roots or []]
+    allowed = {}
 
-    tu = index.parse(filename, args=extra_args)
+    def in_scope(node) -> bool:
+        f = node.location.file
+        if f is None:
+            return False
+        name = f.name
+        if name not in allowed:
+            path = os.path.realpath(name)
+            allowed[name] = path == main_file or any(path.startswith(r) for r in roots)
+        return allowed[name]
+    return in_scope
+
+
+def extract_classes(filename: str, extra_args=None, index: Index = None, options: int = 0,
+                    main_only: bool = True, roots: List[str] = None,
+                    includes: List[str] = None, tu_cache=None) -> List[InterfaceRecord]:
+    """Parse a header file and return all C++ class/struct/interface info.
+
+    Pass a long-lived ``index`` to avoid creating a new Index per file, and
+    ``parse_options(fast=True)`` to skip function bodies.
+
+    By default only declarations located in ``filename`` itself are reported:
+    subtrees from included files (STL, vendor headers) are pruned before
+    descending. ``roots`` additionally admits files under those directories;
+    ``main_only=False`` walks everything. Each class is reported once per
+    translation unit (by USR), preferring its definition over forward
+    declarations.
+
+    If an ``includes`` list is given, the paths of the files ``filename``
+    includes directly are appended to it. With a ``tu_cache``
+    (tu_cache.TUCache), the translation unit is loaded from the cache when
+    the header, its includes and the flags are unchanged, and saved there
+    after a fresh parse.
+    """
+    index = index or Index.create()
+    extra_args = extra_args or DEFAULT_ARGS
+
+    tu = tu_cache.load(index, filename, extra_args, options) if tu_cache else None
+    if tu is None:
+        tu = index.parse(filename, args=extra_args, options=options)
+        if tu_cache:
+            tu_cache.store(tu, filename, extra_args, options)
     results = []
+    by_usr = {}
+    in_scope = _location_filter(filename, roots) if main_only else None
 
     def visit(node, namespace=''):
+        if in_scope and node.kind != CursorKind.TRANSLATION_UNIT and not in_scope(node):
+            return
         # Only care about classes and structs
         if node.kind in (CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL):
-            class_info = {
-                'name': node.spelling,
-                'namespace': namespace,
-                'kind': 'class' if node.kind == CursorKind.CLASS_DECL else 'struct',
-                'bases': [],
-                'methods': [],
-                'file': node.location.file.name if node.location.file else '',
-                'line': node.location.line,
-            }
+            usr = node.get_usr()
+            is_definition = node.is_definition()
+            if usr in by_usr and (not is_definition or results[by_usr[usr]].is_definition):
+                return
+            class_info = InterfaceRecord(
+                name=node.spelling,
+                type='class' if node.kind == CursorKind.CLASS_DECL else 'struct',
+                namespace=namespace,
+                usr=usr,
+                is_definition=is_definition,
+                file=node.location.file.name if node.location.file else '',
+                line=node.location.line,
+                base_usrs=[],
+            )
             # Inheritance
             for c in node.get_children():
                 if c.kind == CursorKind.CXX_BASE_SPECIFIER:
-                    class_info['bases'].append(c.spelling)
+                    class_info.bases.append(sys.intern(c.spelling))
+                    base = c.type.get_declaration()
+                    class_info.base_usrs.append(base.get_usr() if base.kind != CursorKind.NO_DECL_FOUND else '')
             # Methods
             for c in node.get_children():
                 if c.kind in (CursorKind.CXX_METHOD, CursorKind.CONSTRUCTOR, CursorKind.DESTRUCTOR):
-                    method_info = {
-                        'name': c.spelling,
-                        'signature': c.type.spelling,
-                        'access': ACCESS.get(c.access_specifier, 'public'),
-                        'is_virtual': c.is_virtual_method(),
-                        'is_pure': c.is_pure_virtual_method() if hasattr(c, 'is_pure_virtual_method') else False,
-                        'is_static': c.is_static_method() if hasattr(c, 'is_static_method') else False,
-                        'is_const': c.type.is_const_qualified() if hasattr(c.type, 'is_const_qualified') else False,
-                    }
-                    class_info['methods'].append(method_info)
-            results.append(class_info)
+                    method_info = MethodRecord(
+                        name=c.spelling,
+                        signature=c.type.spelling,
+                        access=ACCESS.get(c.access_specifier, 'public'),
+                        is_virtual=c.is_virtual_method(),
+                        is_pure=c.is_pure_virtual_method() if hasattr(c, 'is_pure_virtual_method') else False,
+                        is_static=c.is_static_method() if hasattr(c, 'is_static_method') else False,
+                        is_const=c.type.is_const_qualified() if hasattr(c.type, 'is_const_qualified') else False,
+                    )
+                    class_info.methods.append(method_info)
+            if usr in by_usr:
+                results[by_usr[usr]] = class_info
+            else:
+                by_usr[usr] = len(results)
+                results.append(class_info)
         # Namespaces
         elif node.kind == CursorKind.NAMESPACE:
             ns = node.spelling if not namespace else namespace + '::' + node.spelling
@@ -88,9 +202,31 @@ def extract_classes(filename: str, extra_args=None) -> List[Dict]:
             for c in node.get_children():
                 visit(c, namespace)
     visit(tu.cursor)
+    if includes is not None:
+        includes.extend(inc.include.name for inc in tu.get_includes() if inc.depth == 1)
     return results
 
 
+def dedupe_classes(classes: List[Dict]) -> List[Dict]:
+    """Merge results from several files, keeping one entry per USR.
+
+    A definition wins over forward declarations; otherwise the first entry
+    is kept, so the order of first appearance is preserved.
+    """
+    merged = []
+    by_usr = {}
+    for cl in classes:
+        usr = cl.get('usr')
+        if not usr:
+            merged.append(cl)
+        elif usr not in by_usr:
+            by_usr[usr] = len(merged)
+            merged.append(cl)
+        elif cl.get('is_definition') and not merged[by_usr[usr]].get('is_definition'):
+            merged[by_usr[usr]] = cl
+    return merged
+
+
 def print_class_table(classes: List[Dict]):
     print("| Name | Namespace | Kind | Bases | Public Methods | Virtual | Pure | File | Line |")
     print("|------|-----------|------|-------|---------------|---------|------|------|------|")
@@ -106,6 +242,9 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser("C++ AST Class Extractor (Phase 2)")
     parser.add_argument('filename', help="Input C++ header file")
+    parser.add_argument('--fast', action='store_true', help="Skip function bodies (declarations only)")
+    parser.add_argument('--all-includes', action='store_true', help="Also report classes from included files")
     args = parser.parse_args()
-    results = extract_classes(args.filename)
+    results = extract_classes(args.filename, options=parse_options(fast=args.fast),
+                              main_only=not args.all_includes)
     print_class_table(results)
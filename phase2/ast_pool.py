@@ -0,0 +1,86 @@
+"""
+Parallel libclang Parsing
+Distributes headers across worker processes, each holding a long-lived
+clang Index, and streams per-file results back in input order.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# ast_parser configures the libclang library location on import
+from ast_parser import extract_classes
+from clang.cindex import Index
+from tu_cache import TUCache
+
+# One Index per worker process, created by _init_worker
+_index = None
+_options = 0
+_scope = {}
+_includes = False
+_tu_cache = None
+
+
+def _init_worker(options: int = 0, scope: Dict = None, includes: bool = False,
+                 tu_cache_dir: str = None):
+    global _index, _options, _scope, _includes, _tu_cache
+    _index = Index.create()
+    _options = options
+    _scope = scope or {}
+    _includes = includes
+    _tu_cache = TUCache(tu_cache_dir) if tu_cache_dir else None
+
+
+def _parse(task: Tuple[str, Optional[List[str]]]) -> Tuple[Optional[List[Dict]], Optional[str], Optional[List[str]]]:
+    filename, args = task
+    includes = [] if _includes else None
+    try:
+        classes = extract_classes(filename, extra_args=args, index=_index, options=_options,
+                                  includes=includes, tu_cache=_tu_cache, **_scope)
+        return classes, None, includes
+    except Exception as e:
+        return None, str(e), None
+
+
+def parse_headers(files: List[str], jobs: int = 1, options: int = 0,
+                  file_args: Dict[str, List[str]] = None,
+                  scope: Dict = None, chunksize: int = None,
+                  includes: bool = False,
+                  tu_cache_dir: str = None) -> Iterator[Tuple[str, Optional[List[Dict]], Optional[str], Optional[List[str]]]]:
+    """
+    Parse headers with libclang, optionally across several processes.
+
+    Args:
+        files: Header paths to parse
+        jobs: Number of worker processes (1 parses in-process, 0 uses all cores)
+        options: libclang parse flags (see ast_parser.parse_options)
+        file_args: Compiler arguments per header (missing headers use
+                   extract_classes' default)
+        scope: Location filter passed to extract_classes (main_only, roots)
+        chunksize: Headers per submitted task (None to choose automatically)
+        includes: Also report the paths each header includes directly
+        tu_cache_dir: Load and save translation units in this TUCache
+                      directory (None to always parse)
+
+    Yields:
+        (filename, classes or None, error message or None, included paths
+         or None), in input order
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    file_args = file_args or {}
+    tasks = [(filename, file_args.get(filename)) for filename in files]
+
+    if jobs <= 1 or len(files) <= 1:
+        _init_worker(options, scope, includes, tu_cache_dir)
+        for task in tasks:
+            yield (task[0], *_parse(task))
+        return
+
+    # libclang parses are slow and uneven, so keep chunks small
+    chunksize = chunksize or max(1, min(8, len(files) // (jobs * 4)))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                             initargs=(options, scope, includes, tu_cache_dir)) as executor:
+        for filename, result in zip(files, executor.map(_parse, tasks, chunksize=chunksize)):
+            yield (filename, *result)
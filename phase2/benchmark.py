@@ -0,0 +1,69 @@
+"""
+Parse-time benchmark for libclang options
+Times extract_classes over a header set with default and fast interface
+parse options, and with fast options served from a warm translation-unit
+cache, and reports the speedup.
+
+Usage:
+    python benchmark.py /path/to/STM32CubeF4/Drivers/STM32F4xx_HAL_Driver/Inc --max 50
+"""
+
+import argparse
+import tempfile
+import time
+
+from clang.cindex import Index
+from ast_parser import extract_classes, parse_options
+from analyzer import find_headers
+from tu_cache import TUCache
+
+
+def time_parse(files, options: int, repeat: int = 1, tu_cache: TUCache = None):
+    """Return (best seconds, classes found) for parsing all files with one Index."""
+    best = None
+    found = 0
+    for _ in range(repeat):
+        index = Index.create()
+        found = 0
+        start = time.perf_counter()
+        for f in files:
+            try:
+                found += len(extract_classes(f, index=index, options=options, tu_cache=tu_cache))
+            except Exception:
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, found
+
+
+def main():
+    parser = argparse.ArgumentParser("Benchmark libclang parse options")
+    parser.add_argument('directory', help="Directory of headers to parse")
+    parser.add_argument('--max', type=int, default=None, help="Maximum files to parse")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per mode (best is reported)")
+    args = parser.parse_args()
+
+    files = sorted(find_headers(args.directory))
+    if args.max:
+        files = files[:args.max]
+    print(f"Benchmarking {len(files)} headers, best of {args.repeat}")
+
+    modes = [
+        ("default", parse_options()),
+        ("fast", parse_options(fast=True)),
+    ]
+    baseline = None
+    for name, options in modes:
+        seconds, found = time_parse(files, options, args.repeat)
+        baseline = baseline or seconds
+        print(f"  {name:8} {seconds:8.3f}s  {found:6} classes  {baseline / seconds:5.2f}x")
+
+    with tempfile.TemporaryDirectory(prefix='ast_tu_cache_') as cache_dir:
+        tu_cache = TUCache(cache_dir)
+        time_parse(files, parse_options(fast=True), 1, tu_cache)  # fill the cache
+        seconds, found = time_parse(files, parse_options(fast=True), args.repeat, tu_cache)
+        print(f"  {'cached':8} {seconds:8.3f}s  {found:6} classes  {baseline / seconds:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+compile_commands.json Support
+Maps each header to the compiler flags of a translation unit that includes it,
+so libclang sees the same include paths and defines as the real build.
+"""
+
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s*[<"]([^>"]+)[>"]', re.MULTILINE)
+
+# Flags whose argument is a path relative to the command directory, given as
+# the next argument or joined (-Iinclude); joined forms only match when the
+# remainder is not another option, so -include-pch is not -include + "-pch"
+PATH_FLAGS = ('-isystem', '-iquote', '-idirafter', '-include', '-imacros', '-isysroot',
+              '-include-pch', '--sysroot', '-I', '-F')
+INCLUDE_DIR_FLAGS = ('-isystem', '-iquote', '-idirafter', '-I')
+# Flags whose next argument is their value and is not a path
+VALUE_FLAGS = {'-target', '-D', '-U', '-arch', '-Xclang', '-Xpreprocessor', '-mllvm',
+               '-std', '--std', '-stdlib', '-gcc-toolchain', '-iprefix', '-iwithprefix'}
+# Output/dependency flags that are meaningless for libclang
+DROP_FLAGS = {'-c', '-MD', '-MMD', '-MP', '-M', '-MM'}
+DROP_FLAGS_WITH_ARG = {'-o', '-MF', '-MT', '-MQ', '-x'}
+C_SOURCE_EXTS = {'.c'}
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _absolute(path: str, directory: str) -> str:
+    return os.path.normpath(os.path.join(directory, path))
+
+
+def _joined_path_flag(arg: str) -> Optional[str]:
+    """Return the path flag arg starts with if it is a joined form like -Iinclude, else None."""
+    if arg.startswith('--sysroot='):
+        return '--sysroot='
+    for flag in PATH_FLAGS:
+        rest = arg[len(flag):]
+        if arg.startswith(flag) and rest and not rest.startswith('-') and flag != '--sysroot':
+            return flag
+    return None
+
+
+def header_args(arguments: List[str], directory: str, source: str) -> List[str]:
+    """Turn a TU's compile command into args for parsing one of its headers."""
+    args = []
+    items = iter(arguments[1:])  # Skip the compiler executable
+    for arg in items:
+        if arg in DROP_FLAGS:
+            continue
+        if arg in DROP_FLAGS_WITH_ARG:
+            next(items, None)
+            continue
+        if arg.startswith(('-o', '-MF', '-MT', '-MQ', '-x')):
+            continue
+        if arg in PATH_FLAGS:
+            args += [arg, _absolute(next(items, ''), directory)]
+            continue
+        if arg in VALUE_FLAGS:
+            # Passed through with its value unchanged (e.g. -Xclang -include-pch)
+            args += [arg, next(items, '')]
+            continue
+        if not arg.startswith('-'):
+            # The source file itself (or another input)
+            continue
+        flag = _joined_path_flag(arg)
+        if flag:
+            arg = flag + _absolute(arg[len(flag):], directory)
+        args.append(arg)
+
+    language = 'c' if os.path.splitext(source)[1] in C_SOURCE_EXTS else 'c++'
+    return ['-x', language] + args
+
+
+def include_dirs(args: List[str]) -> List[str]:
+    """Return the include directories named in a list of header args."""
+    dirs = []
+    items = iter(args)
+    for arg in items:
+        if arg in INCLUDE_DIR_FLAGS:
+            dirs.append(next(items, ''))
+            continue
+        for flag in INCLUDE_DIR_FLAGS:
+            if arg.startswith(flag) and len(arg) > len(flag):
+                dirs.append(arg[len(flag):])
+                break
+    return dirs
+
+
+class CompileFlagsIndex:
+    """
+    Index over a compilation database answering "which flags parse this header".
+
+    Built once per run: every TU source is scanned for its direct #includes,
+    which are resolved against the TU's include directories. A header then
+    gets the flags of the first TU that includes it; otherwise a TU with the
+    same stem, then a TU in the same directory, then a TU whose include path
+    covers the header's directory. Lookups are memoized.
+    """
+
+    def __init__(self, build_dir: str):
+        # ast_parser configures the libclang library location on import;
+        # imported here so header_args() works without libclang
+        import ast_parser  # noqa: F401
+        from clang.cindex import CompilationDatabase
+
+        db = CompilationDatabase.fromDirectory(build_dir)
+        self.includers: Dict[str, List[str]] = {}
+        self.by_stem: Dict[str, List[str]] = defaultdict(list)
+        self.by_dir: Dict[str, List[str]] = {}
+        self.by_include_dir: Dict[str, List[str]] = {}
+        self._cache: Dict[str, Optional[List[str]]] = {}
+        self.command_count = 0
+
+        for cmd in db.getAllCompileCommands():
+            source = _normalize(os.path.join(cmd.directory, cmd.filename))
+            args = header_args(list(cmd.arguments), cmd.directory, source)
+            dirs = [_normalize(d) for d in include_dirs(args)]
+            self.command_count += 1
+
+            stem, _ = os.path.splitext(source)
+            self.by_stem[os.path.basename(stem)].append(args)
+            self.by_dir.setdefault(os.path.dirname(source), args)
+            for d in dirs:
+                self.by_include_dir.setdefault(d, args)
+
+            for header in self._direct_includes(source, dirs):
+                self.includers.setdefault(header, args)
+
+    @staticmethod
+    def _direct_includes(source: str, dirs: List[str]) -> List[str]:
+        try:
+            with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except OSError:
+            return []
+        found = []
+        search = [os.path.dirname(source)] + dirs
+        for spelled in INCLUDE_RE.findall(content):
+            for d in search:
+                candidate = os.path.join(d, spelled)
+                if os.path.isfile(candidate):
+                    found.append(_normalize(candidate))
+                    break
+        return found
+
+    def flags_for(self, header: str) -> Optional[List[str]]:
+        """Return the args to parse a header with, or None if no TU matches."""
+        key = _normalize(header)
+        if key in self._cache:
+            return self._cache[key]
+
+        args = self.includers.get(key)
+        if args is None:
+            stem = os.path.splitext(os.path.basename(key))[0]
+            same_stem = self.by_stem.get(stem)
+            directory = os.path.dirname(key)
+            if same_stem:
+                args = same_stem[0]
+            elif directory in self.by_dir:
+                args = self.by_dir[directory]
+            else:
+                while directory and args is None:
+                    args = self.by_include_dir.get(directory)
+                    parent = os.path.dirname(directory)
+                    directory = parent if parent != directory else ''
+
+        self._cache[key] = args
+        return args
+
+    def is_in_build(self, header: str) -> bool:
+        """True if a TU includes the header or it lies under a build include dir."""
+        key = _normalize(header)
+        if key in self.includers:
+            return True
+        directory = os.path.dirname(key)
+        while directory:
+            if directory in self.by_include_dir:
+                return True
+            parent = os.path.dirname(directory)
+            directory = parent if parent != directory else ''
+        return False
@@ -0,0 +1,64 @@
+"""
+Tests for compile_commands.json flag translation (header_args).
+Run with: python -m pytest phase2/test_compile_db.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from compile_db import header_args, include_dirs
+
+BUILD = os.path.normpath('/b')
+SOURCE = os.path.join(BUILD, 'src', 'uart.cpp')
+
+
+def p(path: str) -> str:
+    """Absolute form of a build-relative path, as header_args produces it."""
+    return os.path.normpath(os.path.join(BUILD, path))
+
+
+# (compile command after the compiler, expected header args after '-x c++')
+CASES = [
+    # Separated values are kept with their flag
+    (['-target', 'armv7m-none-eabi'], ['-target', 'armv7m-none-eabi']),
+    (['-D', 'FOO=1', '-U', 'BAR'], ['-D', 'FOO=1', '-U', 'BAR']),
+    (['-arch', 'arm64'], ['-arch', 'arm64']),
+    (['-std', 'c++17'], ['-std', 'c++17']),
+    # Separated paths are made absolute
+    (['-I', 'include'], ['-I', p('include')]),
+    (['-isystem', '/sdk/include'], ['-isystem', '/sdk/include']),
+    (['-iquote', 'q', '-idirafter', 'after'], ['-iquote', p('q'), '-idirafter', p('after')]),
+    (['-include', 'config.h', '-imacros', 'macros.h'], ['-include', p('config.h'), '-imacros', p('macros.h')]),
+    (['-isysroot', '/sdk'], ['-isysroot', '/sdk']),
+    (['--sysroot', '/opt/sr'], ['--sysroot', '/opt/sr']),
+    # Joined forms
+    (['-Iinclude', '-DFOO=1', '-std=c++17'], ['-I' + p('include'), '-DFOO=1', '-std=c++17']),
+    (['-includeconfig.h', '-isystem/sdk/include'], ['-include' + p('config.h'), '-isystem/sdk/include']),
+    (['--sysroot=sr'], ['--sysroot=' + p('sr')]),
+    # -Xclang pairs pass through unchanged; -include-pch is not -include + "-pch"
+    (['-Xclang', '-include-pch', '-Xclang', '/b/x.pch'], ['-Xclang', '-include-pch', '-Xclang', '/b/x.pch']),
+    (['-include-pch', 'x.pch'], ['-include-pch', p('x.pch')]),
+    # Output, dependency and input arguments are dropped
+    (['-c', '-o', 'uart.o', '-MD', '-MF', 'uart.d', 'src/uart.cpp'], []),
+    (['-x', 'c++', '-Wall', 'src/uart.cpp'], ['-Wall']),
+]
+
+
+@pytest.mark.parametrize('command, expected', CASES)
+def test_header_args(command, expected):
+    assert header_args(['clang++'] + command, BUILD, SOURCE) == ['-x', 'c++'] + expected
+
+
+def test_header_args_c_source():
+    assert header_args(['cc', '-c', 'main.c'], BUILD, os.path.join(BUILD, 'main.c')) == ['-x', 'c']
+
+
+def test_include_dirs():
+    args = header_args(['clang++', '-I', 'include', '-isystem/sdk', '-D', 'FOO', '-include', 'config.h'],
+                       BUILD, SOURCE)
+    assert include_dirs(args) == [p('include'), '/sdk']
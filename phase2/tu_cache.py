@@ -0,0 +1,153 @@
+"""
+Serialized Translation-Unit Cache
+Saves each parsed header's translation unit with TranslationUnit.save and
+reloads it with Index.read while the header, everything it includes and its
+compiler flags are unchanged, so unchanged headers are never re-parsed.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from clang.cindex import Index, TranslationUnit, TranslationUnitLoadError, TranslationUnitSaveError
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "cpp-interface-analyzer", "tu")
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Bump when the entry layout changes so old entries are never read
+CACHE_VERSION = 1
+
+# Arguments naming a file the translation unit depends on but does not report
+# through get_includes()
+FILE_ARGS = ('-include-pch',)
+
+
+def entry_key(filename: str, args: List[str], options: int) -> str:
+    """Return the cache entry name for a header parsed with args and options."""
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_VERSION}\0{os.path.abspath(filename)}\0{options}\0".encode('utf-8'))
+    digest.update('\0'.join(args).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class TUCache:
+    """
+    On-disk cache of parsed translation units.
+
+    Each header has one entry per set of compiler flags and parse options:
+    the saved TU (<key>.ast) and the content hashes of the header and of
+    every file it includes, directly or not (<key>.json). load() returns
+    the saved TU only if every hash still matches. A saved TU that clang
+    refuses to load (e.g. an include was touched, or libclang was upgraded)
+    counts as a miss and is replaced when the header is re-parsed.
+
+    Hits refresh an entry's modification time; evict() removes the least
+    recently used entries until the cache fits within max_bytes. Several
+    processes can share a cache directory: entries are written to temporary
+    files and moved into place.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # path -> (mtime_ns, size, content hash), so shared includes are
+        # hashed once per process
+        self._hashes: Dict[str, tuple] = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _file_hash(self, path: str) -> Optional[str]:
+        """Return the content hash of a file, or None if it cannot be read."""
+        try:
+            stat = os.stat(path)
+            known = self._hashes.get(path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                return known[2]
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _paths(self, key: str) -> tuple:
+        base = os.path.join(self.cache_dir, key)
+        return base + '.ast', base + '.json'
+
+    def load(self, index: Index, filename: str, args: List[str], options: int) -> Optional[TranslationUnit]:
+        """Return the saved translation unit for a header if it is still valid, else None."""
+        ast_path, deps_path = self._paths(entry_key(filename, args, options))
+        try:
+            with open(deps_path, 'r', encoding='utf-8') as f:
+                files = json.load(f)
+            if any(self._file_hash(path) != digest for path, digest in files.items()):
+                raise ValueError("dependency changed")
+            tu = index.read(ast_path)
+            os.utime(ast_path)
+        except (OSError, ValueError, TranslationUnitLoadError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return tu
+
+    def store(self, tu: TranslationUnit, filename: str, args: List[str], options: int):
+        """Save a freshly parsed translation unit with the hashes of its files."""
+        paths = [filename] + [inc.include.name for inc in tu.get_includes()]
+        paths += [args[i + 1] for i, arg in enumerate(args[:-1]) if arg in FILE_ARGS]
+        files = {}
+        for path in paths:
+            digest = self._file_hash(path)
+            if digest is None:
+                return
+            files[path] = digest
+
+        ast_path, deps_path = self._paths(entry_key(filename, args, options))
+        suffix = f'.{os.getpid()}.tmp'
+        try:
+            tu.save(ast_path + suffix)
+            os.replace(ast_path + suffix, ast_path)
+            with open(deps_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump(files, f)
+            os.replace(deps_path + suffix, deps_path)
+        except (OSError, TranslationUnitSaveError):
+            for path in (ast_path + suffix, deps_path + suffix):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def size(self) -> tuple:
+        """Return (entry count, total bytes) of the cache."""
+        entries = self._entries()
+        return len(entries), sum(size for _, size, _ in entries)
+
+    def _entries(self) -> List[tuple]:
+        """Return (key, bytes, last used) for every saved entry."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.ast'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((name[:-len('.ast')], stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self) -> int:
+        """Remove least recently used entries until within max_bytes; return how many."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for key, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        return removed